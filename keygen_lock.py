@@ -13,18 +13,37 @@ Each developer using this code should **replace SECRET_KEY** with their own valu
 Example:
     export PYKG_SECRET="MySuperSecretKey!"
 or change the constant below directly.
+
+🔁 Key rotation:
+Set PYKG_KEYRING to issue tokens tagged with a key ID, so old keys keep
+verifying after you rotate to a new one:
+    export PYKG_KEYRING="k1:hmac-sha256:OldSecret,k2:blake2b:NewSecret"
+The last entry is the active (signing) key. Tokens without a key ID are
+still checked against SECRET_KEY.
+
+🖧 Clusters:
+Pass a list of hardware IDs to generate_license() to cover several machines.
+The token then carries a sorted set of short HWID hashes ("hwset") that
+verification binary-searches. Pass a license_seats.SeatStore to
+verify_license() to also enforce max_users as concurrent seats.
 """
 
+import asyncio
 import base64
+import functools
 import hashlib
 import hmac
 import json
 import platform
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional, Union
 import os
 
+from license_codec import (
+    MAX_TOKEN_LENGTH, SIGNATURE_SIZE, KID_PATTERN, TokenDecodeError, decode_token, encode_token, parse_payload,
+)
+
 
 # =====================================================
 # CONFIGURATION
@@ -51,6 +70,169 @@ def get_hardware_id() -> str:
     return hashlib.sha256(base.encode("utf-8")).hexdigest()[:16].upper()
 
 
+# =====================================================
+# MULTI-HWID SETS
+# =====================================================
+
+# Bytes of BLAKE2b kept per hardware ID in a cluster token's hwset;
+# 6 bytes encode to exactly 8 base64 characters with no padding
+HWSET_DIGEST_SIZE = 6
+_HWSET_ENTRY_CHARS = 8
+
+
+def hwid_digest(hwid: str) -> str:
+    """Fixed-width (8 character) base64url hash of one hardware ID."""
+    digest = hashlib.blake2b(hwid.strip().upper().encode("utf-8"), digest_size=HWSET_DIGEST_SIZE).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii")
+
+
+def pack_hwset(hwids: Iterable[str]) -> str:
+    """
+    Sorted, de-duplicated HWID hashes concatenated into one string. Entries
+    are sorted as text, so hwset_contains() can search the token's string
+    directly without decoding it.
+    """
+    return "".join(sorted({hwid_digest(h) for h in hwids}))
+
+
+@functools.lru_cache(maxsize=1)
+def _local_hwid_digest() -> str:
+    # The local hardware ID is fixed for the life of the process
+    return hwid_digest(get_hardware_id())
+
+
+def hwset_contains(hwset: str, hwid: str) -> bool:
+    """Binary search for a hardware ID in a packed hwset (O(log n))."""
+    return _hwset_search(hwset, hwid_digest(hwid))
+
+
+def _hwset_search(hwset: str, digest: str) -> bool:
+    size = _HWSET_ENTRY_CHARS
+    lo, hi = 0, len(hwset) // size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        entry = hwset[mid * size:(mid + 1) * size]
+        if entry == digest:
+            return True
+        if entry < digest:
+            lo = mid + 1
+        else:
+            hi = mid
+    return False
+
+
+def hwset_size(hwset: str) -> int:
+    return len(hwset) // _HWSET_ENTRY_CHARS
+
+
+# =====================================================
+# SIGNING KEYS & KEYRING
+# =====================================================
+
+SIGNING_ALGORITHMS = ("hmac-sha256", "blake2b")
+
+
+class SigningKey:
+    """
+    One secret plus a pre-initialised MAC state.
+    sign() copies the keyed state instead of re-keying on every call.
+    """
+
+    __slots__ = ("kid", "algorithm", "_mac")
+
+    def __init__(self, secret: bytes, algorithm: str = "hmac-sha256", kid: Optional[str] = None):
+        if algorithm == "hmac-sha256":
+            self._mac = hmac.new(secret, digestmod=hashlib.sha256)
+        elif algorithm == "blake2b":
+            self._mac = hashlib.blake2b(key=secret, digest_size=SIGNATURE_SIZE)
+        else:
+            raise ValueError(f"Unknown signing algorithm {algorithm!r} (use one of {SIGNING_ALGORITHMS})")
+        self.kid = kid
+        self.algorithm = algorithm
+
+    def sign(self, data: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(data)
+        return mac.digest()[:SIGNATURE_SIZE]
+
+
+class Keyring:
+    """
+    Signing keys indexed by key ID.
+    New tokens are signed with the active key; verification looks the key up by
+    the ID carried in the token, so retired keys keep verifying until removed.
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, SigningKey] = {}
+        self.active_kid: Optional[str] = None
+
+    def add(self, kid: str, secret: bytes, algorithm: str = "hmac-sha256", activate: bool = False) -> SigningKey:
+        if not KID_PATTERN.fullmatch(kid):
+            raise ValueError(f"Invalid key ID {kid!r} (1-16 chars of A-Z a-z 0-9 _ -)")
+        key = SigningKey(secret, algorithm, kid)
+        self._keys[kid] = key
+        if activate or self.active_kid is None:
+            self.active_kid = kid
+        return key
+
+    def activate(self, kid: str) -> None:
+        if kid not in self._keys:
+            raise KeyError(kid)
+        self.active_kid = kid
+
+    def remove(self, kid: str) -> None:
+        del self._keys[kid]
+        if self.active_kid == kid:
+            self.active_kid = None
+
+    def get(self, kid: str) -> Optional[SigningKey]:
+        return self._keys.get(kid)
+
+    @property
+    def active(self) -> SigningKey:
+        if self.active_kid is None:
+            raise LookupError("Keyring has no active key")
+        return self._keys[self.active_kid]
+
+    def __contains__(self, kid: str) -> bool:
+        return kid in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "Keyring":
+        """
+        Build a keyring from "kid:algorithm:secret" entries separated by commas.
+        The last entry becomes the active key.
+        """
+        ring = cls()
+        for n, entry in enumerate(filter(None, (e.strip() for e in spec.split(","))), 1):
+            parts = entry.split(":", 2)
+            if len(parts) != 3 or not parts[2]:
+                # Never echo the entry itself: it contains the secret
+                raise ValueError(f"entry {n} is not in \"kid:algorithm:secret\" form")
+            kid, algorithm, secret = parts
+            ring.add(kid, secret.encode("utf-8"), algorithm, activate=True)
+        if not len(ring):
+            raise ValueError("no keys given")
+        return ring
+
+
+def load_keyring_from_env(var: str = "PYKG_KEYRING") -> Optional[Keyring]:
+    spec = os.environ.get(var)
+    if not spec:
+        return None
+    try:
+        return Keyring.from_spec(spec)
+    except ValueError as e:
+        raise ValueError(f"Malformed {var} environment variable: {e}") from None
+
+
+DEFAULT_KEYRING = load_keyring_from_env()
+
+
 # =====================================================
 # LICENSE GENERATOR & VALIDATOR
 # =====================================================
@@ -62,16 +244,27 @@ class HardwareLicense:
       - Expiry date
       - Max users
       - Hardware ID (lock)
+
+    With a keyring, tokens are issued as "<kid>.<base64>" and signed with the
+    keyring's active key; tokens without a key ID use `secret_key` (HMAC-SHA256).
+
+    Pass `audit` (e.g. license_audit.AuditLog) to record every generation and
+    verification; its record() must be cheap, as it runs inline.
     """
 
-    def __init__(self, secret_key: bytes = SECRET_KEY):
+    def __init__(self, secret_key: bytes = SECRET_KEY, keyring: Optional[Keyring] = DEFAULT_KEYRING,
+                 audit=None):
         self.secret_key = secret_key
+        self.keyring = keyring
+        self.audit = audit
+        self._legacy_key = SigningKey(secret_key)
 
     def _sign(self, data: bytes) -> bytes:
         """Generate short HMAC signature."""
-        return hmac.new(self.secret_key, data, hashlib.sha256).digest()[:8]
+        return self._legacy_key.sign(data)
 
-    def generate_license(self, product: str, expiry_date: str, max_users: int, hwid: str) -> str:
+    def generate_license(self, product: str, expiry_date: str, max_users: int,
+                         hwid: Union[str, Iterable[str]]) -> str:
         """
         Generate a base64-encoded license string tied to a hardware ID.
 
@@ -79,7 +272,7 @@ class HardwareLicense:
             product (str): Product name
             expiry_date (str): Expiration date (YYYY-MM-DD)
             max_users (int): Maximum allowed users
-            hwid (str): Hardware ID to lock license
+            hwid (str | list): Hardware ID to lock license, or several for a cluster
 
         Returns:
             str: Encoded license key
@@ -88,36 +281,73 @@ class HardwareLicense:
             "product": product.upper(),
             "exp": expiry_date,
             "users": int(max_users),
-            "hwid": hwid
         }
+        hwids = [hwid] if isinstance(hwid, str) else list(dict.fromkeys(hwid))
+        if not hwids:
+            raise ValueError("At least one hardware ID is required")
+        if len(hwids) == 1:
+            payload["hwid"] = hwids[0]
+        else:
+            payload["hwset"] = pack_hwset(hwids)
         payload_bytes = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
-        signature = self._sign(payload_bytes)
-        token = base64.urlsafe_b64encode(payload_bytes + b"." + signature).decode("utf-8").rstrip("=")
+        if self.keyring is not None:
+            key = self.keyring.active
+            token = encode_token(payload_bytes, key.sign(payload_bytes), key.kid)
+        else:
+            token = encode_token(payload_bytes, self._sign(payload_bytes))
+        if len(token) > MAX_TOKEN_LENGTH:
+            raise ValueError(f"Too many hardware IDs ({len(hwids)}) for one license token")
+        if self.audit is not None:
+            details = dict(payload)
+            if "hwset" in details:
+                details["hwset"] = len(hwids)
+            self.audit.record("generate", **details)
         return token
 
-    def verify_license(self, token: str, grace_days: int = 7) -> Dict[str, Any]:
+    def verify_license(self, token: str, grace_days: int = 7, seats=None,
+                       seat_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Verify authenticity, hardware match, and expiry (with grace period).
 
         Args:
             token (str): License key string
             grace_days (int): Days allowed after expiry
+            seats: Optional license_seats.SeatStore; when given, max_users is
+                enforced as concurrent seats (this machine must hold one or
+                a free one must be left)
+            seat_id (str): Seat to check (default: this machine's hardware ID)
 
         Returns:
             dict: Verification result
         """
+        result = self._verify(token, grace_days)
+        if seats is not None and result["valid"]:
+            result = self._check_seats(result, token, seats, seat_id or get_hardware_id())
+        if self.audit is not None:
+            info = result.get("info") or {}
+            self.audit.record("verify", valid=result["valid"], reason=result["reason"],
+                              product=info.get("product"), hwid=info.get("hwid"))
+        return result
+
+    def _verify(self, token: str, grace_days: int) -> Dict[str, Any]:
         try:
-            padding = "=" * ((4 - len(token) % 4) % 4)
-            raw = base64.urlsafe_b64decode(token + padding)
-            if b"." not in raw:
-                return {"valid": False, "reason": "Invalid token format"}
-
-            payload_bytes, signature = raw.rsplit(b".", 1)
-            expected_sig = self._sign(payload_bytes)
-            if not hmac.compare_digest(signature, expected_sig):
+            # Structural checks first: junk is rejected before any MAC or JSON work
+            try:
+                decoded = decode_token(token)
+            except TokenDecodeError as e:
+                return {"valid": False, "reason": str(e)}
+
+            if decoded.kid is None:
+                key = self._legacy_key
+            else:
+                key = self.keyring.get(decoded.kid) if self.keyring is not None else None
+                if key is None:
+                    return {"valid": False, "reason": f"Unknown key ID {decoded.kid!r}"}
+
+            if not hmac.compare_digest(decoded.signature, key.sign(decoded.payload)):
                 return {"valid": False, "reason": "Invalid signature"}
 
-            payload = json.loads(payload_bytes.decode("utf-8"))
+            payload = parse_payload(decoded)
             exp_date = datetime.strptime(payload["exp"], "%Y-%m-%d").date()
             today = datetime.now().date()
             days_left = (exp_date - today).days
@@ -136,9 +366,12 @@ class HardwareLicense:
                 else:
                     return {"valid": False, "reason": "License and grace period expired"}
 
-            # Hardware check
-            current_hwid = get_hardware_id()
-            if current_hwid != payload.get("hwid"):
+            # Hardware check: one ID compared directly, a cluster set binary-searched
+            hwset = payload.get("hwset")
+            if hwset is not None:
+                if not _hwset_search(hwset, _local_hwid_digest()):
+                    return {"valid": False, "reason": "Hardware mismatch (not in this license's hardware set)"}
+            elif get_hardware_id() != payload.get("hwid"):
                 return {"valid": False, "reason": f"Hardware mismatch (expected {payload.get('hwid')})"}
 
             return {"valid": True, "grace": False, "days_left": days_left, "reason": "License valid", "info": payload}
@@ -146,6 +379,36 @@ class HardwareLicense:
         except Exception as e:
             return {"valid": False, "reason": f"Verification failed: {str(e)}"}
 
+    @staticmethod
+    def _check_seats(result: Dict[str, Any], token: str, seats, seat_id: str) -> Dict[str, Any]:
+        # Pick up seats taken or released by other processes (rate-limited, never waits on a writer)
+        seats.refresh()
+        license_id = seats.license_id(token)
+        in_use = seats.in_use(license_id)
+        max_users = int(result["info"].get("users", 0))
+        if not seats.holds(license_id, seat_id) and in_use >= max_users:
+            return {"valid": False, "reason": f"All {max_users} seats in use", "info": result["info"]}
+        return dict(result, seats_in_use=in_use)
+
+    # -------------------------------------------------
+    # asyncio variants (offload work from the event loop)
+    # -------------------------------------------------
+
+    async def agenerate_license(self, product: str, expiry_date: str, max_users: int,
+                                hwid: Union[str, Iterable[str]], executor=None) -> str:
+        """Async generate_license(); runs in `executor` (default: the loop's thread pool)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.generate_license, product, expiry_date, max_users, hwid)
+
+    async def averify_license(self, token: str, grace_days: int = 7, executor=None, seats=None,
+                              seat_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Async verify_license(). Signature checking and get_hardware_id()
+        (which may spawn a subprocess) run off the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.verify_license, token, grace_days, seats, seat_id)
+
 
 # =====================================================
 # DEMO USAGE
@@ -7,6 +7,7 @@ This script builds on top of `keygen_lock.py` to provide:
     • Multi-license generation
     • JSON export for records
     • Optional batch license creation
+    • Cluster licenses covering several hardware IDs
     • Clean, reusable functions
 
 💡 Usage:
@@ -15,20 +16,11 @@ This script builds on top of `keygen_lock.py` to provide:
 """
 
 import json
-import os
 from datetime import datetime, timedelta
 from typing import List, Dict
 
-from keygen_lock import HardwareLicense, get_hardware_id
-
-
-# =====================================================
-# CONFIGURATION
-# =====================================================
-
-# You can override this by setting PYKG_SECRET in your environment.
-# Each developer should use their own secret key.
-SECRET_KEY = os.environ.get("PYKG_SECRET", "ExampleKey123!").encode("utf-8")
+# SECRET_KEY is configured once in keygen_lock (PYKG_SECRET / PYKG_KEYRING).
+from keygen_lock import HardwareLicense, get_hardware_id, SECRET_KEY
 
 
 # =====================================================
@@ -93,6 +85,28 @@ def batch_generate_licenses(
     return results
 
 
+def generate_cluster_license(
+    product: str,
+    expiry_date: str,
+    max_users: int,
+    hwids: List[str]
+) -> str:
+    """
+    Generate one license valid on every machine in `hwids`.
+
+    Args:
+        product (str): Product name.
+        expiry_date (str): Expiration date (YYYY-MM-DD).
+        max_users (int): Maximum concurrent seats (see license_seats).
+        hwids (List[str]): Hardware IDs of the cluster's machines.
+
+    Returns:
+        str: License key string.
+    """
+    license_gen = HardwareLicense(secret_key=SECRET_KEY)
+    return license_gen.generate_license(product, expiry_date, max_users, hwids)
+
+
 def save_licenses_to_file(licenses: List[Dict[str, str]], filename: str = "licenses.json") -> None:
     """
     Save a list of generated licenses to a JSON file.
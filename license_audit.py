@@ -0,0 +1,186 @@
+# license_audit.py
+"""
+Append-only audit trail of license events (generate, renew, export, email, verify).
+
+record() only appends a tuple to an in-memory ring buffer, so it costs
+microseconds on the generate/verify paths. A background thread writes the
+buffer to the audit_events table of a separate SQLite file in one
+transaction, every `flush_interval` seconds or as soon as `flush_size`
+events are waiting. close() (also registered with atexit) flushes whatever
+is left.
+
+If the buffer ever reaches `capacity` before a flush (a burst, or the audit
+database being unavailable), the oldest events are dropped and counted in
+`dropped`; the next successful flush writes a "dropped" event with the
+number lost since the previous one, so gaps show up in the trail itself.
+
+Usage:
+    from license_audit import get_audit_log
+    get_audit_log().record("verify", product="ACME", valid=True)
+"""
+
+import atexit
+import datetime
+import getpass
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+
+AUDIT_DB_FILE = "audit.db"
+
+
+def _current_user():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "unknown"
+
+
+class AuditLog:
+    """Ring-buffered, write-behind audit log."""
+
+    def __init__(self, db_file=AUDIT_DB_FILE, capacity=100_000, flush_interval=2.0, flush_size=500, actor=None):
+        self.db_file = db_file
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        # Wake the writer no later than when the buffer is full, so drops are always counted
+        self.flush_size = min(flush_size, capacity)
+        self.actor = actor or _current_user()
+        self.dropped = 0
+        self._dropped_written = 0
+        self._buffer = deque(maxlen=capacity)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._schema_ready = False
+
+    # ---------------------------
+    #  Hot path
+    # ---------------------------
+    def record(self, event, **details):
+        """Queue one event. Details must be JSON-serialisable."""
+        if self._thread is None:
+            self._start()
+        buf = self._buffer
+        size = len(buf)
+        if size >= self.flush_size:
+            if size >= self.capacity:
+                self.dropped += 1
+            self._wake.set()
+        buf.append((time.time(), self.actor, event, details))
+
+    # ---------------------------
+    #  Background writer
+    # ---------------------------
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="license-audit")
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # Keep the writer alive; events stay buffered for the next attempt
+                pass
+
+    def _ensure_schema(self, con):
+        if self._schema_ready:
+            return
+        con.execute("""
+            CREATE TABLE IF NOT EXISTS audit_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts TEXT,
+                actor TEXT,
+                event TEXT,
+                details TEXT
+            )
+        """)
+        self._schema_ready = True
+
+    def flush(self):
+        """Write all buffered events in one transaction. Returns the number written."""
+        with self._flush_lock:
+            buf = self._buffer
+            batch = []
+            while buf:
+                batch.append(buf.popleft())
+            if not batch and self.dropped == self._dropped_written:
+                return 0
+
+            rows = [
+                (datetime.datetime.fromtimestamp(ts).isoformat(timespec="microseconds"),
+                 actor, event, json.dumps(details, default=str) if details else None)
+                for ts, actor, event, details in batch
+            ]
+            lost = self.dropped - self._dropped_written
+            if lost:
+                rows.append((datetime.datetime.now().isoformat(timespec="microseconds"),
+                             self.actor, "dropped", json.dumps({"events": lost})))
+            try:
+                con = sqlite3.connect(self.db_file, timeout=30)
+                try:
+                    with con:
+                        self._ensure_schema(con)
+                        con.executemany(
+                            "INSERT INTO audit_events (ts, actor, event, details) VALUES (?, ?, ?, ?)", rows
+                        )
+                finally:
+                    con.close()
+            except sqlite3.Error:
+                # Put the batch back in front, oldest first. Whatever no longer
+                # fits is the oldest part of the batch; drop and count it here
+                # rather than letting the deque silently drop the newest events.
+                overflow = min(len(batch), len(batch) + len(buf) - self.capacity)
+                if overflow > 0:
+                    self.dropped += overflow
+                    batch = batch[overflow:]
+                buf.extendleft(reversed(batch))
+                raise
+            self._dropped_written += lost
+            return len(batch)
+
+    def close(self):
+        """Stop the writer thread and flush everything still buffered."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def fetch_events(self, limit=100):
+        """Most recent audit events (flushing first), newest first."""
+        self.flush()
+        con = sqlite3.connect(self.db_file, timeout=30)
+        try:
+            self._ensure_schema(con)
+            return con.execute(
+                "SELECT id, ts, actor, event, details FROM audit_events ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        finally:
+            con.close()
+
+
+# =====================================================
+# MODULE-LEVEL DEFAULT LOG
+# =====================================================
+
+_audit_log = None
+_audit_lock = threading.Lock()
+
+
+def get_audit_log():
+    global _audit_log
+    with _audit_lock:
+        if _audit_log is None:
+            _audit_log = AuditLog()
+        return _audit_log
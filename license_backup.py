@@ -0,0 +1,247 @@
+# license_backup.py
+"""
+Online backups of the license database(s) using SQLite's backup API.
+
+Pages are copied `pages` at a time with a short sleep between steps. On WAL
+databases (license_store enables WAL) the copy reads from one pinned read
+transaction, so generation and the GUI keep committing while it runs and the
+copy never restarts; other journal modes only lock the source per step, but
+the copy restarts whenever another connection writes. Each snapshot:
+    • lives in its own timestamped folder under `backup_dir`
+    • is checked with PRAGMA integrity_check before it is kept
+    • is skipped when nothing changed since the previous snapshot
+      (compared through the license_changes log, see license_store)
+Only the newest `keep` snapshots are retained. restore() copies a snapshot
+back online and marks the change log so open ChangeFeeds do a full reload.
+
+Usage:
+    mgr = BackupManager(keep=24)
+    mgr.snapshot()              # one backup now (blocking)
+    mgr.start(interval=3600)    # hourly in a background thread
+    ...
+    mgr.stop()
+"""
+
+import datetime
+import json
+import os
+import shutil
+import sqlite3
+import threading
+
+import license_store
+
+BACKUP_DIR = "backups"
+MANIFEST = "manifest.json"
+
+
+class BackupError(Exception):
+    pass
+
+
+def _fingerprint(path):
+    """Cheap "has anything changed" marker for one database file."""
+    con = sqlite3.connect(path, timeout=30)
+    try:
+        seq = con.execute("SELECT COALESCE(MAX(seq), 0) FROM license_changes").fetchone()[0]
+        return {"seq": seq}
+    except sqlite3.OperationalError:
+        # No change log (foreign or very old file): fall back to size + mtime
+        st = os.stat(path)
+        return {"size": st.st_size, "mtime": st.st_mtime}
+    finally:
+        con.close()
+
+
+def _max_change_seq(path):
+    con = sqlite3.connect(path, timeout=30)
+    try:
+        return con.execute("SELECT COALESCE(MAX(seq), 0) FROM license_changes").fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        con.close()
+
+
+def _mark_restore(path, live_seq):
+    """
+    Append a restore marker to the change log, far enough past the pre-restore
+    end of the log that every open ChangeFeed asks for a full reload instead of
+    silently waiting for seq to catch up with its cursor.
+    """
+    con = sqlite3.connect(path, timeout=30)
+    try:
+        with con:
+            restored = con.execute("SELECT COALESCE(MAX(seq), 0) FROM license_changes").fetchone()[0]
+            seq = max(live_seq, restored) + license_store.CHANGE_FEED_MAX_BATCH + 1
+            con.execute("INSERT INTO license_changes (seq, license_id, op) VALUES (?, 0, 'R')", (seq,))
+    except sqlite3.OperationalError:
+        pass  # no change log (e.g. the archive file)
+    finally:
+        con.close()
+
+
+def verify_snapshot(path):
+    """Raise BackupError unless every database in a snapshot folder passes integrity_check."""
+    for name in os.listdir(path):
+        if not name.endswith(".db"):
+            continue
+        con = sqlite3.connect(os.path.join(path, name))
+        try:
+            result = con.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            con.close()
+        if result != "ok":
+            raise BackupError(f"{name}: integrity check failed ({result})")
+
+
+class BackupManager:
+    """Snapshots, rotation and scheduling for the active (or given) license databases."""
+
+    def __init__(self, db_files=None, backup_dir=BACKUP_DIR, keep=7, pages=256, step_sleep=0.005):
+        self._db_files = db_files
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self.pages = pages
+        self.step_sleep = step_sleep
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_error = None
+        self.last_snapshot = None
+
+    @property
+    def db_files(self):
+        return list(self._db_files or license_store.get_backend().db_files())
+
+    # ---------------------------
+    #  Snapshots
+    # ---------------------------
+    def list_snapshots(self):
+        """Snapshot folders, oldest first."""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        names = sorted(
+            n for n in os.listdir(self.backup_dir)
+            if os.path.isfile(os.path.join(self.backup_dir, n, MANIFEST))
+        )
+        return [os.path.join(self.backup_dir, n) for n in names]
+
+    def _last_manifest(self):
+        snapshots = self.list_snapshots()
+        if not snapshots:
+            return None
+        with open(os.path.join(snapshots[-1], MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _copy(self, src_path, dst_path, progress=None):
+        src = sqlite3.connect(src_path, timeout=30, isolation_level=None)
+        dst = sqlite3.connect(dst_path)
+        try:
+            pinned = src.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            if pinned:
+                # Hold one WAL read snapshot for the whole copy; writers are not blocked
+                src.execute("BEGIN")
+                src.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            src.backup(dst, pages=self.pages, progress=progress, sleep=self.step_sleep)
+            if pinned:
+                src.execute("COMMIT")
+        finally:
+            dst.close()
+            src.close()
+
+    def snapshot(self, force=False, progress=None):
+        """
+        Back up every database file into a new snapshot folder.
+        Returns the folder, or None when nothing changed and `force` is false.
+        `progress(name, status, remaining, total)` is passed to the backup API.
+        """
+        with self._lock:
+            files = self.db_files
+            fingerprints = {os.path.basename(p): _fingerprint(p) for p in files if os.path.exists(p)}
+            last = self._last_manifest()
+            if not force and last and last.get("files") == fingerprints:
+                return None
+
+            stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            final = os.path.join(self.backup_dir, stamp)
+            tmp = final + ".partial"
+            os.makedirs(tmp)
+            try:
+                for path in files:
+                    name = os.path.basename(path)
+                    if name not in fingerprints:
+                        continue
+                    cb = (lambda status, remaining, total, name=name: progress(name, status, remaining, total)) \
+                        if progress else None
+                    self._copy(path, os.path.join(tmp, name), cb)
+                verify_snapshot(tmp)
+                with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+                    json.dump({"created": stamp, "files": fingerprints}, f, indent=2)
+                os.replace(tmp, final)
+            except BaseException:
+                shutil.rmtree(tmp, ignore_errors=True)
+                raise
+
+            self.last_snapshot = final
+            self.rotate()
+            return final
+
+    def rotate(self):
+        """Delete all but the newest `keep` snapshots."""
+        snapshots = self.list_snapshots()
+        for path in snapshots[:max(0, len(snapshots) - self.keep)]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def restore(self, snapshot_path, db_file=None):
+        """Copy a snapshot's database back over the live file (online, via the backup API)."""
+        verify_snapshot(snapshot_path)
+        targets = [db_file] if db_file else self.db_files
+        for target in targets:
+            src = os.path.join(snapshot_path, os.path.basename(target))
+            if os.path.exists(src):
+                live_seq = _max_change_seq(target) if os.path.exists(target) else None
+                self._copy(src, target)
+                if live_seq is not None:
+                    _mark_restore(target, live_seq)
+
+    # ---------------------------
+    #  Background operation
+    # ---------------------------
+    def snapshot_in_background(self, force=False):
+        """Run one snapshot on a worker thread; returns the thread."""
+        thread = threading.Thread(target=self._safe_snapshot, args=(force,), daemon=True, name="license-backup")
+        thread.start()
+        return thread
+
+    def _safe_snapshot(self, force=False):
+        try:
+            self.last_error = None
+            return self.snapshot(force)
+        except Exception as e:
+            self.last_error = e
+            return None
+
+    def start(self, interval=3600):
+        """Take a snapshot every `interval` seconds until stop()."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self._safe_snapshot()
+
+        self._thread = threading.Thread(target=loop, daemon=True, name="license-backup-scheduler")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+if __name__ == "__main__":
+    path = BackupManager().snapshot(force=True)
+    print(f"[✔] Snapshot written to {os.path.abspath(path)}")
@@ -0,0 +1,195 @@
+# license_codec.py
+"""
+Shared license token codec.
+
+Token layout:
+    [<kid>.]<urlsafe-base64( payload_json + b"." + signature )>
+
+decode_token() rejects oversized, short, non-ASCII, bad-key-ID and
+non-JSON-object input before decoding anything (up to two trailing "=" of
+padding are accepted). The body is then translated and decoded in one pass
+over the text; the alphabet and signature separator are checked on that
+result. Payload and signature are memoryview slices of the one decoded
+buffer, and parse_payload() reads the JSON straight from the view. Callers
+parse only after the signature has been checked.
+"""
+
+import base64
+import binascii
+import json
+import re
+import zlib
+from typing import Any, Dict, NamedTuple, Optional, Union
+
+# Length of the truncated signature appended to every token.
+SIGNATURE_SIZE = 8
+
+# Shortest payload we ever emit is well above this; anything shorter is junk.
+MIN_PAYLOAD_SIZE = 16
+# Generous upper bound (multi-HWID tokens included); longer input is rejected unread.
+MAX_TOKEN_LENGTH = 16384
+
+# Key IDs must avoid "." and stay inside the urlsafe base64 alphabet.
+KID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,16}")
+
+# "-_" -> "+/"; the standard-only "+/" become "\n", which a2b_base64 discards
+_URLSAFE_TO_STD = bytes.maketrans(b"-_+/", b"+/\n\n")
+# base64 length of the smallest acceptable body (payload + separator + signature)
+_MIN_BODY_LENGTH = ((MIN_PAYLOAD_SIZE + 1 + SIGNATURE_SIZE) * 4 + 2) // 3
+
+
+# =====================================================
+# ERRORS
+# =====================================================
+
+class TokenDecodeError(ValueError):
+    """Base class for structurally invalid tokens."""
+
+
+class TokenLengthError(TokenDecodeError):
+    pass
+
+
+class TokenVersionError(TokenDecodeError):
+    """The key-ID prefix is malformed."""
+
+
+class TokenAlphabetError(TokenDecodeError):
+    pass
+
+
+class TokenFormatError(TokenDecodeError):
+    pass
+
+
+class SignatureLengthError(TokenDecodeError):
+    pass
+
+
+# =====================================================
+# ENCODE / DECODE
+# =====================================================
+
+class DecodedToken(NamedTuple):
+    kid: Optional[str]
+    payload: memoryview
+    signature: memoryview
+
+
+# Skips NamedTuple's Python-level __new__ on the hot path
+_new_decoded = tuple.__new__
+
+
+def encode_token(payload_bytes: bytes, signature: bytes, kid: Optional[str] = None) -> str:
+    body = base64.urlsafe_b64encode(payload_bytes + b"." + signature).decode("ascii").rstrip("=")
+    return f"{kid}.{body}" if kid else body
+
+
+def decode_token(token: Union[str, bytes]) -> DecodedToken:
+    """
+    Split a token into (kid, payload, signature) without verifying it.
+    Raises a TokenDecodeError subclass describing the first problem found.
+    """
+    if len(token) > MAX_TOKEN_LENGTH:
+        raise TokenLengthError(f"Invalid token format: longer than {MAX_TOKEN_LENGTH} characters")
+    if isinstance(token, str):
+        try:
+            data = token.encode("ascii")
+        except UnicodeEncodeError:
+            raise TokenAlphabetError("Invalid token format: non-ASCII characters") from None
+    else:
+        data = token
+
+    kid = None
+    start = data.find(b".") + 1
+    if start:
+        kid = data[:start - 1].decode("ascii")
+        if not KID_PATTERN.fullmatch(kid):
+            raise TokenVersionError(f"Invalid token format: bad key ID {kid!r}")
+    end = len(data)
+    if end - start < _MIN_BODY_LENGTH:
+        raise TokenLengthError("Invalid token format: too short")
+    # Older tokens (and base64 tools) may carry "=" padding; at most two are legal
+    if data[-1] == 0x3D:  # b"="
+        end -= 2 if data[-2] == 0x3D else 1
+
+    n = end - start
+    if n % 4 == 1:
+        raise TokenLengthError("Invalid token format: impossible base64 length")
+    # '{"' always encodes to "ey": a two-byte check that drops junk before decoding
+    if not data.startswith(b"ey", start):
+        raise TokenFormatError("Invalid token format: payload is not a JSON object")
+    # The body is decoded in place (no slice copy). a2b_base64 skips characters
+    # outside the standard alphabet and _URLSAFE_TO_STD turns "+" and "/" into
+    # one of those, so anything outside base64url shortens the output, which
+    # the length check catches.
+    pad = -n % 4
+    std = data.translate(_URLSAFE_TO_STD)
+    if len(data) != end + pad:
+        # Canonical tokens are unpadded; a2b_base64 wants exact padding
+        std = (std if len(data) == end else std[:end]) + b"=" * pad
+    try:
+        raw = binascii.a2b_base64(memoryview(std)[start:] if start else std)
+    except binascii.Error:
+        raw = b""
+    if len(raw) != n * 3 // 4:
+        raise TokenAlphabetError("Invalid token format: characters outside the base64url alphabet")
+    if raw[-SIGNATURE_SIZE - 1] != 0x2E:  # b"."
+        raise SignatureLengthError(f"Invalid token format: signature is not {SIGNATURE_SIZE} bytes")
+
+    view = memoryview(raw)
+    return _new_decoded(DecodedToken, (kid, view[:-SIGNATURE_SIZE - 1], view[-SIGNATURE_SIZE:]))
+
+
+# =====================================================
+# COMPACT STORAGE FORM (cold archive)
+# =====================================================
+
+# Preset dictionary holding the JSON skeleton every payload shares.
+_PACK_ZDICT = b'{"exp":"2026-01-01","hwid":"0123456789ABCDEF","product":"","users":'
+_PACK_RAW = b"\x00"      # kid + b"\n" + decoded body
+_PACK_LITERAL = b"\x01"  # token text as-is (not canonical base64)
+
+
+def _zlib_compress(data: bytes) -> bytes:
+    c = zlib.compressobj(9, zdict=_PACK_ZDICT)
+    return c.compress(data) + c.flush()
+
+
+def pack_token(token: Optional[str]) -> Optional[bytes]:
+    """
+    Compress a token for archival (~45% smaller than the text). Canonical
+    tokens are stored decoded; anything else is kept verbatim. None (a NULL
+    key on an old row) stays None.
+    """
+    if token is None:
+        return None
+    try:
+        decoded = decode_token(token)
+        raw = decoded.payload.obj  # the single decoded buffer both views share
+        if encode_token(raw[:-SIGNATURE_SIZE - 1], raw[-SIGNATURE_SIZE:], decoded.kid) == token:
+            return _PACK_RAW + _zlib_compress((decoded.kid or "").encode("ascii") + b"\n" + raw)
+    except TokenDecodeError:
+        pass
+    return _PACK_LITERAL + _zlib_compress(token.encode("utf-8"))
+
+
+def unpack_token(blob: Optional[bytes]) -> Optional[str]:
+    """Inverse of pack_token()."""
+    if blob is None:
+        return None
+    d = zlib.decompressobj(zdict=_PACK_ZDICT)
+    data = d.decompress(blob[1:]) + d.flush()
+    if blob[:1] == _PACK_LITERAL:
+        return data.decode("utf-8")
+    kid, _, body = data.partition(b"\n")
+    return encode_token(body[:-SIGNATURE_SIZE - 1], body[-SIGNATURE_SIZE:], kid.decode("ascii") or None)
+
+
+def parse_payload(decoded: DecodedToken) -> Dict[str, Any]:
+    """JSON payload of a decoded token (call after checking the signature)."""
+    # str() decodes straight from the view; json.loads would decode a bytes copy anyway
+    payload = json.loads(str(decoded.payload, "utf-8"))
+    if not isinstance(payload, dict):
+        raise TokenFormatError("Invalid token format: payload is not a JSON object")
+    return payload
@@ -0,0 +1,241 @@
+# license_fixtures.py
+"""
+Deterministic synthetic license fleets for scale tests and benchmarks.
+
+Builds a licenses database with realistic-looking rows:
+    • products and clients follow Zipf-like popularity (a few dominate)
+    • licenses are issued over the past `years` years with common terms
+      (30 days .. 3 years), so expiry dates spread into past and future
+    • user counts are skewed towards small seat numbers
+    • every key is a real token signed through HardwareLicense
+
+The same seed (and anchor date) always produces the same rows. Signing runs
+in a process pool while the main process inserts the previous chunk in one
+transaction.
+
+Usage:
+    python license_fixtures.py fleet_100k.db --rows 100000 --seed 7
+    python license_fixtures.py fleet_1m.db --rows 1000000 --bench
+
+    from license_fixtures import fixture_db
+    path = fixture_db(1_000_000)      # built once, cached under fixtures/
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from keygen_lock import HardwareLicense
+from license_store import SQLiteBackend, _INSERT
+
+FIXTURE_DIR = "fixtures"
+
+# Fleets are generated relative to a fixed "today" so fixtures never drift
+ANCHOR_DATE = datetime.date(2025, 1, 1)
+
+_PRODUCT_WORDS = ("CHRONO", "LEDGER", "VAULT", "PIXEL", "ORBIT", "SENTRY", "FORGE", "NIMBUS",
+                  "ATLAS", "QUILL", "RADAR", "HELIX")
+_PRODUCT_EDITIONS = ("", "_PRO", "_LITE", "_SERVER")
+_CLIENT_PREFIXES = ("Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Hooli", "Vandelay",
+                    "Tyrell", "Cyberdyne", "Soylent", "Wonka", "Oscorp", "Aperture", "Gringotts")
+_CLIENT_SUFFIXES = ("Ltd", "Inc", "GmbH", "LLC", "Pty", "BV", "SA", "Group")
+
+# (days valid, relative weight)
+_TERMS = ((30, 10), (90, 15), (365, 50), (730, 15), (1095, 10))
+# (max users, relative weight)
+_SEATS = ((1, 30), (2, 15), (5, 25), (10, 15), (25, 8), (50, 4), (100, 2), (500, 1))
+
+
+def _zipf_cum_weights(n, s=1.1):
+    total, cum = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** s
+        cum.append(total)
+    return cum
+
+
+def _cum(pairs):
+    total, cum = 0, []
+    for _, weight in pairs:
+        total += weight
+        cum.append(total)
+    return [value for value, _ in pairs], cum
+
+
+class FleetSpec:
+    """Deterministic row generator; yields chunks of unsigned rows."""
+
+    def __init__(self, rows, seed=1234, years=5, today=None):
+        self.rows = rows
+        self.rng = random.Random(seed)
+        self.today = today or ANCHOR_DATE
+        self.first_day = self.today.toordinal() - int(years * 365)
+
+        rng = self.rng
+        self.products = [w + e for w in _PRODUCT_WORDS for e in _PRODUCT_EDITIONS]
+        rng.shuffle(self.products)
+        n_clients = max(10, rows // 25)
+        self.clients = [
+            f"{rng.choice(_CLIENT_PREFIXES)} {rng.choice(_CLIENT_SUFFIXES)} {i:06d}" for i in range(n_clients)
+        ]
+        self.product_weights = _zipf_cum_weights(len(self.products))
+        self.client_weights = _zipf_cum_weights(n_clients, s=0.9)
+        self.terms, self.term_weights = _cum(_TERMS)
+        self.seats, self.seat_weights = _cum(_SEATS)
+
+    def chunks(self, chunk_size):
+        """Yield lists of (client, product, expiry, users, hwid, date_generated)."""
+        rng = self.rng
+        span = self.today.toordinal() - self.first_day
+        left = self.rows
+        while left > 0:
+            n = min(chunk_size, left)
+            left -= n
+            products = rng.choices(self.products, cum_weights=self.product_weights, k=n)
+            clients = rng.choices(self.clients, cum_weights=self.client_weights, k=n)
+            terms = rng.choices(self.terms, cum_weights=self.term_weights, k=n)
+            seats = rng.choices(self.seats, cum_weights=self.seat_weights, k=n)
+            # Issue dates sorted so ids grow with date_generated, as in a real store
+            issued = sorted(self.first_day + rng.randrange(span) for _ in range(n))
+            chunk = []
+            for i in range(n):
+                day = issued[i]
+                chunk.append((
+                    clients[i],
+                    products[i],
+                    datetime.date.fromordinal(day + terms[i]).isoformat(),
+                    seats[i],
+                    f"{rng.getrandbits(64):016X}",
+                    datetime.date.fromordinal(day).isoformat(),
+                ))
+            yield chunk
+
+
+def _sign_chunk(chunk):
+    """Worker: sign a chunk and return rows ready for INSERT."""
+    gen = HardwareLicense()
+    return [
+        (client, product, gen.generate_license(product, expiry, users, hwid), expiry, users, hwid, issued)
+        for client, product, expiry, users, hwid, issued in chunk
+    ]
+
+
+def generate_fleet(db_file, rows=10_000, seed=1234, workers=None, chunk_size=20_000, years=5, today=None,
+                   progress=None):
+    """
+    Build (or extend) `db_file` with `rows` synthetic licenses.
+    `progress(done, total)` is called after every committed chunk.
+    """
+    backend = SQLiteBackend(db_file)
+    backend.init_db()
+
+    con = sqlite3.connect(db_file)
+    # Fixture builds are disposable; trade durability for speed
+    con.execute("PRAGMA journal_mode=MEMORY")
+    con.execute("PRAGMA synchronous=OFF")
+
+    spec = FleetSpec(rows, seed, years, today)
+    workers = workers or os.cpu_count() or 1
+    # Bounded look-ahead keeps memory flat on 10M-row builds
+    window = workers * 2
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        chunks = spec.chunks(chunk_size)
+
+        def fill():
+            while len(pending) < window:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                pending.append(pool.submit(_sign_chunk, chunk))
+
+        fill()
+        while pending:
+            signed = pending.popleft().result()
+            fill()
+            with con:
+                con.executemany(_INSERT, signed)
+            done += len(signed)
+            if progress:
+                progress(done, rows)
+    con.close()
+
+    # Prunes the change log the inserts produced
+    backend.init_db()
+    return db_file
+
+
+def fixture_db(rows, seed=1234, directory=FIXTURE_DIR, years=5, today=None, chunk_size=20_000, workers=None):
+    """
+    Path to a cached fleet database with `rows` rows, building it on first use.
+    Everything that shapes the rows is part of the file name, so a different
+    spec never returns a stale fixture (`workers` only changes build speed).
+    """
+    today = today or ANCHOR_DATE
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"fleet_{rows}_{seed}_{today.isoformat()}_{years}y_c{chunk_size}.db")
+    if not os.path.exists(path):
+        tmp = path + ".building"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        generate_fleet(tmp, rows, seed, workers, chunk_size, years, today)
+        os.replace(tmp, path)
+    return path
+
+
+def run_benchmarks(db_file, term="ACME"):
+    """Time the common store / GUI paths against a fixture database."""
+    from license_snapshot import LicenseSnapshot
+
+    backend = SQLiteBackend(db_file)
+    results = {}
+
+    t = time.perf_counter()
+    rows = backend.fetch_all()
+    results["fetch_all"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    backend.search(term)
+    results[f"search({term!r})"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    snap = LicenseSnapshot.from_rows(rows)
+    results["snapshot load"] = time.perf_counter() - t
+
+    for col in ("client_name", "expiry_date"):
+        t = time.perf_counter()
+        snap.sorted_ids(col, descending=True)
+        results[f"sort {col}"] = time.perf_counter() - t
+
+    return len(rows), results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a synthetic licenses database.")
+    parser.add_argument("db_file")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument("--today", type=datetime.date.fromisoformat, default=None,
+                        help=f"anchor date for issue/expiry spread (default {ANCHOR_DATE})")
+    parser.add_argument("--bench", action="store_true", help="time fetch/search/sort afterwards")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    generate_fleet(args.db_file, args.rows, args.seed, args.workers, args.chunk_size, today=args.today,
+                   progress=lambda done, total: print(f"\r{done:,}/{total:,} rows", end="", flush=True))
+    elapsed = time.perf_counter() - start
+    print(f"\n[✔] {args.rows:,} rows in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s) -> {args.db_file}")
+
+    if args.bench:
+        count, timings = run_benchmarks(args.db_file)
+        print(f"\nBenchmarks on {count:,} rows:")
+        for name, seconds in timings.items():
+            print(f"  {name:<24} {seconds * 1000:9.1f} ms")
@@ -23,14 +23,34 @@ Developers:
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
-import smtplib, ssl, os, datetime
+import smtplib, ssl, os, datetime, queue, threading
 from email.message import EmailMessage
 import sv_ttk, pyperclip
 
 from keygen_lock import HardwareLicense, get_hardware_id
-from license_store import init_db, save_license, fetch_all, search
-
-DB_FILE = "licenses.db"
+from license_store import (
+    init_db, save_license, fetch_all, search, fetch_by_ids, open_change_feed, archive_expired, ARCHIVE_AFTER_DAYS,
+    row_matches_search,
+)
+from license_search import SearchJob, SearchCache
+from license_audit import get_audit_log
+from license_snapshot import LicenseSnapshot
+from license_backup import BackupManager
+
+# How often to pick up rows written by other processes (ms)
+CHANGE_POLL_MS = 1500
+# Search-as-you-type: wait this long after the last keystroke before querying (ms)
+SEARCH_DEBOUNCE_MS = 250
+# How often streamed search results are moved into the table (ms)
+SEARCH_STREAM_MS = 30
+# Scheduled online backups (skipped automatically when nothing changed)
+BACKUP_INTERVAL_S = 3600
+
+
+def split_hwids(text):
+    """HWID field -> one ID, or a list for a cluster license ("ID1, ID2, ...")."""
+    hwids = [h.strip() for h in text.split(",") if h.strip()]
+    return hwids[0] if len(hwids) == 1 else hwids
 
 
 class LicenseApp(tk.Tk):
@@ -40,8 +60,22 @@ class LicenseApp(tk.Tk):
         self.geometry("1040x620")
         sv_ttk.use_dark_theme()
         init_db()
+        self.audit = get_audit_log()
+        self.feed = open_change_feed()
+        self.search_term = None
+        self.search_job = None
+        self.search_after_id = None
+        self.search_cache = SearchCache()
+        self.snapshot = None
+        self.sort_column, self.sort_desc = None, False
+        self.backups = BackupManager()
+        self.backup_thread = None
+        self.archive_thread = None
+        self.backups.start(BACKUP_INTERVAL_S)
         self.create_widgets()
         self.load_table()
+        if self.feed:
+            self.after(CHANGE_POLL_MS, self.poll_changes)
 
     # ---------------------------
     #  GUI Setup
@@ -79,6 +113,8 @@ class LicenseApp(tk.Tk):
             ("Send via Email", self.send_license_email),
             ("Verify .key", self.verify_key_dialog),
             ("Refresh", self.load_table),
+            ("Backup DB", self.backup_now),
+            ("Archive Expired", self.archive_now),
             ("Clear Fields", self.clear_fields),
         ]
         for text, cmd in buttons:
@@ -88,6 +124,7 @@ class LicenseApp(tk.Tk):
         ttk.Label(top, text="Search:").grid(row=6, column=0, sticky="e")
         self.search_entry = ttk.Entry(top, width=35)
         self.search_entry.grid(row=6, column=1, padx=5, pady=8)
+        self.search_entry.bind("<KeyRelease>", self.schedule_search)
         ttk.Button(top, text="Find", command=self.search_table).grid(row=6, column=2, padx=5)
 
         # --- Table ---
@@ -106,7 +143,7 @@ class LicenseApp(tk.Tk):
                   "expiry_date": 100, "max_users": 80, "hwid": 150, "date_generated": 110}
 
         for col in columns:
-            self.tree.heading(col, text=headers[col])
+            self.tree.heading(col, text=headers[col], command=lambda c=col: self.sort_by_column(c))
             self.tree.column(col, width=widths[col])
 
         self.tree.pack(fill="both", expand=True, padx=10, pady=10)
@@ -143,15 +180,139 @@ class LicenseApp(tk.Tk):
     #  Database Operations
     # ---------------------------
     def load_table(self, search_text=None):
+        """Full reload. Rows are keyed by license id when a change feed is available."""
+        self.cancel_search()
+        self.search_cache.invalidate()
+        self.search_term = search_text
+        if self.feed:
+            self.feed.reset()
         for i in self.tree.get_children():
             self.tree.delete(i)
-        rows = search(search_text) if search_text else fetch_all()
+        if self.feed:
+            # Whole-table snapshot for sorting / selection; the feed keeps it current
+            all_rows = fetch_all()
+            self.snapshot = LicenseSnapshot.from_rows(all_rows)
+            rows = search(search_text) if search_text else all_rows
+        else:
+            rows = search(search_text) if search_text else fetch_all()
         for row in rows:
-            self.tree.insert("", "end", values=row)
+            self.tree.insert("", "end", iid=str(row[0]) if self.feed else None, values=row)
+
+    def row_matches(self, row):
+        """Does `row` belong in the current view (same rule as the store's search)?"""
+        return not self.search_term or row_matches_search(row, self.search_term)
+
+    def apply_changes(self):
+        """Apply only the rows inserted, changed or deleted since the last refresh."""
+        if not self.feed:
+            self.load_table(self.search_term)
+            return
+        changes = self.feed.poll()
+        if changes is None:
+            self.load_table(self.search_term)
+            return
+        upserted, deleted = changes
+        if upserted or deleted:
+            self.search_cache.invalidate()
+            self.snapshot.apply(upserted, deleted)
+        for license_id in deleted:
+            if self.tree.exists(str(license_id)):
+                self.tree.delete(str(license_id))
+        # upserted is newest first; insert oldest first at the top to keep id DESC order
+        for row in reversed(upserted):
+            iid = str(row[0])
+            if not self.row_matches(row):
+                if self.tree.exists(iid):
+                    self.tree.delete(iid)
+            elif self.tree.exists(iid):
+                self.tree.item(iid, values=row)
+            else:
+                self.tree.insert("", 0, iid=iid, values=row)
+
+    def sort_by_column(self, col):
+        """Reorder the visible rows by `col` using the in-memory snapshot (no DB round trip)."""
+        if not self.snapshot:
+            return
+        self.sort_desc = not self.sort_desc if self.sort_column == col else False
+        self.sort_column = col
+        shown = self.tree.get_children()
+        if not self.search_term and len(shown) == len(self.snapshot):
+            order = self.snapshot.sorted_ids(col, self.sort_desc)
+        else:
+            order = self.snapshot.sorted_ids(col, self.sort_desc, ids=map(int, shown))
+        # One Tk call reorders every row; a move() per row costs a round trip each
+        self.tree.set_children("", *map(str, order))
+
+    def poll_changes(self):
+        self.apply_changes()
+        self.after(CHANGE_POLL_MS, self.poll_changes)
+
+    # ---------------------------
+    #  Search-as-you-type
+    # ---------------------------
+    def schedule_search(self, _=None):
+        """Debounce keystrokes: only the last one within SEARCH_DEBOUNCE_MS triggers a query."""
+        if self.search_after_id:
+            self.after_cancel(self.search_after_id)
+        self.search_after_id = self.after(SEARCH_DEBOUNCE_MS, self.search_table)
+
+    def cancel_search(self):
+        if self.search_job:
+            self.search_job.cancel()
+            self.search_job = None
 
     def search_table(self):
+        self.search_after_id = None
         term = self.search_entry.get().strip()
-        self.load_table(term if term else None)
+        if term == (self.search_term or ""):
+            # Already shown (or still streaming); arrows, Shift, Ctrl-C etc. land here
+            return
+        if not term:
+            self.load_table()
+            return
+
+        self.cancel_search()
+        if self.feed:
+            # Bring the snapshot and search cache up to date before reading ids from either
+            self.apply_changes()
+        self.search_term = term
+        for i in self.tree.get_children():
+            self.tree.delete(i)
+
+        # Cached ids are only trusted while the change feed can invalidate them
+        ids = self.search_cache.get(term) if self.feed else None
+        if ids is not None:
+            for row in fetch_by_ids(ids):
+                self.tree.insert("", "end", iid=str(row[0]), values=row)
+            return
+
+        self.search_job = SearchJob(term)
+        self.search_job.cache_generation = self.search_cache.generation
+        self.search_job.start()
+        self.after(SEARCH_STREAM_MS, self.drain_search, self.search_job)
+
+    def drain_search(self, job):
+        """Move batches the worker has produced so far into the table."""
+        if job is not self.search_job:
+            return  # superseded
+        while True:
+            try:
+                batch = job.results.get_nowait()
+            except queue.Empty:
+                self.after(SEARCH_STREAM_MS, self.drain_search, job)
+                return
+            if batch is None:
+                break
+            for row in batch:
+                iid = str(row[0]) if self.feed else None
+                if iid is None or not self.tree.exists(iid):
+                    self.tree.insert("", "end", iid=iid, values=row)
+
+        self.search_job = None
+        if job.error:
+            messagebox.showerror("Search failed", str(job.error))
+        elif self.feed:
+            self.search_cache.put(job.term, job.found_ids, job.cache_generation)
 
     # ---------------------------
     #  License Operations
@@ -173,10 +334,15 @@ class LicenseApp(tk.Tk):
             return
 
         gen = HardwareLicense()
-        key = gen.generate_license(product, expiry, users, hwid)
+        try:
+            key = gen.generate_license(product, expiry, users, split_hwids(hwid))
+        except ValueError as e:
+            messagebox.showerror("Invalid", str(e))
+            return
         save_license(client, product, key, expiry, users, hwid)
+        self.audit.record("generate", client=client, product=product, exp=expiry, users=users, hwid=hwid)
         messagebox.showinfo("License Generated", f"✅ Saved!\nClient: {client}\nKey:\n{key}")
-        self.load_table()
+        self.apply_changes()
 
     def renew_license(self):
         lic = self.get_selected_license()
@@ -195,10 +361,17 @@ class LicenseApp(tk.Tk):
             return
 
         gen = HardwareLicense()
-        new_key = gen.generate_license(lic["product"], new_exp, int(lic["max_users"]), lic["hwid"])
-        save_license(lic["client_name"], lic["product"], new_key, new_exp, int(lic["max_users"]), lic["hwid"])
+        try:
+            users = int(lic["max_users"])
+            new_key = gen.generate_license(lic["product"], new_exp, users, split_hwids(lic["hwid"]))
+        except ValueError as e:
+            messagebox.showerror("Invalid", str(e))
+            return
+        save_license(lic["client_name"], lic["product"], new_key, new_exp, users, lic["hwid"])
+        self.audit.record("renew", client=lic["client_name"], product=lic["product"], license_id=lic["id"],
+                          old_exp=lic["expiry_date"], exp=new_exp, hwid=lic["hwid"])
         messagebox.showinfo("Renewed", f"✅ License renewed!\nNew expiry: {new_exp}")
-        self.load_table()
+        self.apply_changes()
 
     # ---------------------------
     #  Copy / Export / Verify
@@ -208,6 +381,10 @@ class LicenseApp(tk.Tk):
         if not sel:
             messagebox.showwarning("No selection", "Please select a license first.")
             return None
+        if self.snapshot:
+            lic = self.snapshot.as_dict(int(sel[0]))
+            if lic:
+                return lic
         vals = self.tree.item(sel[0], "values")
         keys = ("id", "client_name", "product", "license_key", "expiry_date", "max_users", "hwid", "date_generated")
         return dict(zip(keys, vals))
@@ -228,6 +405,8 @@ class LicenseApp(tk.Tk):
         if path:
             with open(path, "w") as f:
                 f.write(lic["license_key"])
+            self.audit.record("export", client=lic["client_name"], product=lic["product"],
+                              license_id=lic["id"], path=path)
             messagebox.showinfo("Exported", f"Saved to:\n{path}")
 
     def verify_key_dialog(self):
@@ -252,7 +431,7 @@ class LicenseApp(tk.Tk):
             if not token:
                 messagebox.showwarning("Empty", "Paste or load key first.")
                 return
-            gen = HardwareLicense()
+            gen = HardwareLicense(audit=self.audit)
             res = gen.verify_license(token, grace_days=7)
             if res.get("valid"):
                 info = res.get("info", {})
@@ -273,6 +452,60 @@ class LicenseApp(tk.Tk):
         ttk.Button(btns, text="Verify", command=do_verify).pack(side="left", padx=5)
         ttk.Button(btns, text="Close", command=win.destroy).pack(side="right", padx=5)
 
+    # ---------------------------
+    #  Backups
+    # ---------------------------
+    def backup_now(self):
+        """Snapshot the database on a background thread; the GUI stays usable meanwhile."""
+        if self.backup_thread and self.backup_thread.is_alive():
+            messagebox.showinfo("Backup", "A backup is already running.")
+            return
+        self.backup_thread = self.backups.snapshot_in_background(force=True)
+        self.after(200, self.check_backup)
+
+    def check_backup(self):
+        if self.backup_thread.is_alive():
+            self.after(200, self.check_backup)
+            return
+        if self.backups.last_error:
+            messagebox.showerror("Backup failed", str(self.backups.last_error))
+        else:
+            self.audit.record("backup", path=self.backups.last_snapshot)
+            messagebox.showinfo("Backup", f"✅ Snapshot saved to:\n{os.path.abspath(self.backups.last_snapshot)}")
+
+    def archive_now(self):
+        """Move long-expired and superseded licenses to the archive tier in the background."""
+        if self.archive_thread and self.archive_thread.is_alive():
+            return
+        if not messagebox.askyesno(
+            "Archive Expired",
+            f"Move licenses expired more than {ARCHIVE_AFTER_DAYS} days ago, and licenses replaced by a "
+            f"renewal, to the archive?\n\nThey stay searchable through the store API.",
+        ):
+            return
+        result = {}
+
+        def work():
+            try:
+                result["moved"] = archive_expired()
+            except Exception as e:
+                result["error"] = e
+
+        self.archive_thread = threading.Thread(target=work, daemon=True, name="license-archive")
+        self.archive_thread.start()
+        self.after(200, self.check_archive, result)
+
+    def check_archive(self, result):
+        if self.archive_thread.is_alive():
+            self.after(200, self.check_archive, result)
+            return
+        if "error" in result:
+            messagebox.showerror("Archive failed", str(result["error"]))
+            return
+        self.audit.record("archive", moved=result["moved"])
+        self.apply_changes()
+        messagebox.showinfo("Archive", f"✅ Archived {result['moved']} license(s).")
+
     # ---------------------------
     #  Email Sending
     # ---------------------------
@@ -336,6 +569,8 @@ class LicenseApp(tk.Tk):
                     server.login(sender, pwd)
                     server.send_message(msg)
 
+                self.audit.record("email", client=lic["client_name"], product=lic["product"],
+                                  license_id=lic["id"], recipient=recipient)
                 messagebox.showinfo("Email Sent", f"✅ License sent to {recipient}")
                 win.destroy()
             except Exception as e:
@@ -0,0 +1,81 @@
+# license_search.py
+"""
+Background search support for the GUI:
+    • SearchJob   - runs one search on a worker thread, streaming row batches
+                    through a queue; cancel() aborts the running SQL query.
+    • SearchCache - small LRU of recent search term -> matching license ids.
+"""
+
+import queue
+import threading
+from collections import OrderedDict
+
+import license_store
+
+
+class SearchJob(threading.Thread):
+    """
+    One search on a worker thread. Batches of rows are put on `results`;
+    None marks the end of the stream. Read `error` and `found_ids` after the end marker.
+    """
+
+    def __init__(self, term, batch_size=200, backend=None):
+        super().__init__(daemon=True, name=f"license-search:{term}")
+        self.term = term
+        self.batch_size = batch_size
+        self.backend = backend or license_store.get_backend()
+        self.results = queue.Queue()
+        self.error = None
+        self.found_ids = []
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def run(self):
+        try:
+            for batch in self.backend.iter_search(self.term, self.batch_size, self._cancelled.is_set):
+                self.found_ids.extend(row[0] for row in batch)
+                self.results.put(batch)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.results.put(None)
+
+
+class SearchCache:
+    """
+    LRU cache of search term -> tuple of matching license ids.
+    `generation` moves on every invalidate(), so results of a search that was
+    running while the table changed can be dropped instead of cached.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.generation = 0
+        self._entries = OrderedDict()
+
+    def get(self, term):
+        ids = self._entries.get(term)
+        if ids is not None:
+            self._entries.move_to_end(term)
+        return ids
+
+    def put(self, term, ids, generation=None):
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[term] = tuple(ids)
+        self._entries.move_to_end(term)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self):
+        self.generation += 1
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,195 @@
+# license_seats.py
+"""
+Local floating-seat accounting: enforces a license's max_users as the
+number of machines (seats) holding a lease on it at the same time.
+
+Leases live in a small SQLite file so several processes on one host (or a
+shared volume) see the same seats. acquire() runs in a BEGIN IMMEDIATE
+transaction, drops expired leases and only then counts, so two machines
+can never both take the last seat.
+
+Reads never touch the database or a lock: the store keeps an immutable
+{license_id: {seat_id: expires_at}} map that writers replace as a whole
+(copy-on-write), so in_use() and holds() are a dict lookup. refresh()
+reloads the map when another process has changed the file. It looks at
+most once per `refresh_interval` seconds, on its own read connection, so
+verify_license() can call it before every seat check without waiting on
+a writer.
+
+Usage:
+    seats = SeatStore()
+    lid = seats.license_id(token)
+    if seats.acquire(lid, get_hardware_id(), max_users=5):
+        ...
+        seats.heartbeat(lid, get_hardware_id())   # well within lease_seconds
+        seats.release(lid, get_hardware_id())
+
+    HardwareLicense().verify_license(token, seats=seats)
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from types import MappingProxyType
+
+SEATS_DB_FILE = "seats.db"
+
+_EMPTY = MappingProxyType({})
+
+
+class SeatStore:
+    """Seat leases per license, with lock-free reads."""
+
+    def __init__(self, db_file=SEATS_DB_FILE, lease_seconds=3600, refresh_interval=0.25):
+        self.db_file = db_file
+        self.lease_seconds = lease_seconds
+        self.refresh_interval = refresh_interval
+        self._write_lock = threading.Lock()
+        self._con = sqlite3.connect(db_file, timeout=30, isolation_level=None, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("""
+            CREATE TABLE IF NOT EXISTS seats (
+                license_id TEXT,
+                seat_id TEXT,
+                expires_at REAL,
+                PRIMARY KEY (license_id, seat_id)
+            ) WITHOUT ROWID
+        """)
+        # refresh() reads through its own connection and lock: in WAL mode it
+        # never blocks on (or behind) a writer's BEGIN IMMEDIATE
+        self._read_lock = threading.Lock()
+        self._read_con = sqlite3.connect(db_file, timeout=30, isolation_level=None, check_same_thread=False)
+        self._publish_lock = threading.Lock()
+        self._generation = 0
+        self._data_version = None
+        self._next_refresh = 0.0
+        self._leases = _EMPTY
+        self.refresh(force=True)
+
+    @staticmethod
+    def license_id(token):
+        """Stable id of a license token (the same token always maps to the same seats)."""
+        return hashlib.blake2b(token.strip().encode("utf-8"), digest_size=16).hexdigest()
+
+    # ---------------------------
+    #  Lock-free reads
+    # ---------------------------
+    def seats(self, license_id):
+        """{seat_id: expires_at} of the live leases on a license."""
+        now = time.time()
+        leases = self._leases.get(license_id, _EMPTY)
+        return {seat: exp for seat, exp in leases.items() if exp > now}
+
+    def in_use(self, license_id):
+        now = time.time()
+        return sum(1 for exp in self._leases.get(license_id, _EMPTY).values() if exp > now)
+
+    def holds(self, license_id, seat_id):
+        return self._leases.get(license_id, _EMPTY).get(seat_id, 0) > time.time()
+
+    # ---------------------------
+    #  Writes
+    # ---------------------------
+    def _publish(self, license_id, rows):
+        """Swap in a new map with one license's leases replaced (caller holds the write lock)."""
+        with self._publish_lock:
+            leases = dict(self._leases)
+            if rows:
+                leases[license_id] = MappingProxyType(dict(rows))
+            else:
+                leases.pop(license_id, None)
+            self._leases = MappingProxyType(leases)
+            self._generation += 1
+
+    def _write(self, license_id, work):
+        with self._write_lock:
+            con = self._con
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                con.execute("DELETE FROM seats WHERE license_id = ? AND expires_at <= ?", (license_id, time.time()))
+                result = work(con)
+                rows = con.execute(
+                    "SELECT seat_id, expires_at FROM seats WHERE license_id = ?", (license_id,)
+                ).fetchall()
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+            self._publish(license_id, rows)
+            return result
+
+    def acquire(self, license_id, seat_id, max_users):
+        """Take (or renew) a seat. Returns False when all `max_users` seats are held by others."""
+        expires = time.time() + self.lease_seconds
+
+        def work(con):
+            held = con.execute(
+                "SELECT 1 FROM seats WHERE license_id = ? AND seat_id = ?", (license_id, seat_id)
+            ).fetchone()
+            if not held:
+                count = con.execute("SELECT COUNT(*) FROM seats WHERE license_id = ?", (license_id,)).fetchone()[0]
+                if count >= max_users:
+                    return False
+            con.execute("INSERT OR REPLACE INTO seats VALUES (?, ?, ?)", (license_id, seat_id, expires))
+            return True
+
+        return self._write(license_id, work)
+
+    def heartbeat(self, license_id, seat_id):
+        """Extend a held lease. Returns False if the seat was lost (expired or released)."""
+        expires = time.time() + self.lease_seconds
+
+        def work(con):
+            cur = con.execute(
+                "UPDATE seats SET expires_at = ? WHERE license_id = ? AND seat_id = ?", (expires, license_id, seat_id)
+            )
+            return cur.rowcount > 0
+
+        return self._write(license_id, work)
+
+    def release(self, license_id, seat_id):
+        def work(con):
+            con.execute("DELETE FROM seats WHERE license_id = ? AND seat_id = ?", (license_id, seat_id))
+
+        self._write(license_id, work)
+
+    # ---------------------------
+    #  Cross-process sync
+    # ---------------------------
+    def refresh(self, force=False):
+        """
+        Reload all leases if another connection changed the file. Returns True
+        if reloaded. Unless forced, calls within `refresh_interval` of the last
+        check, or while another thread is already checking, return at once.
+        """
+        if not force and time.monotonic() < self._next_refresh:
+            return False
+        if not self._read_lock.acquire(blocking=force):
+            return False
+        try:
+            self._next_refresh = time.monotonic() + self.refresh_interval
+            version = self._read_con.execute("PRAGMA data_version").fetchone()[0]
+            if not force and version == self._data_version:
+                return False
+            generation = self._generation
+            grouped = {}
+            for license_id, seat_id, expires in self._read_con.execute(
+                "SELECT license_id, seat_id, expires_at FROM seats WHERE expires_at > ?", (time.time(),)
+            ):
+                grouped.setdefault(license_id, {})[seat_id] = expires
+            with self._publish_lock:
+                if self._generation != generation:
+                    # A local write published meanwhile; our rows may predate it
+                    self._data_version = None
+                    return False
+                self._leases = MappingProxyType({lid: MappingProxyType(s) for lid, s in grouped.items()})
+                self._data_version = version
+            return True
+        finally:
+            self._read_lock.release()
+
+    def close(self):
+        with self._write_lock, self._read_lock:
+            self._con.close()
+            self._read_con.close()
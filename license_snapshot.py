@@ -0,0 +1,252 @@
+# license_snapshot.py
+"""
+Compact in-memory copy of the licenses table, stored column by column.
+
+    • ids / users / day numbers live in typed arrays (8 or 4 bytes per row)
+    • client and product names are interned, so repeated values share one object
+    • sorting returns row ids and is cached per column; single-row upserts
+      re-slot that row in the cached orders instead of re-sorting
+    • prefix filters test each distinct value once, not once per row
+    • apply() takes ChangeFeed.poll() output for incremental updates
+
+Usage:
+    snap = LicenseSnapshot.from_rows(fetch_all())
+    newest_first = snap.sorted_ids("expiry_date", descending=True)
+    acme = snap.filter_prefix("client_name", "acme")
+"""
+
+import datetime
+import sys
+from array import array
+
+from license_store import COLUMNS
+
+_DATE_COLUMNS = ("expiry_date", "date_generated")
+_INTERNED_COLUMNS = ("client_name", "product")
+# apply() batches larger than this drop the cached sort orders instead of re-slotting rows
+_RESLOT_LIMIT = 256
+
+
+def _to_day(text):
+    """ISO date -> day ordinal, or None if it does not round-trip."""
+    try:
+        day = datetime.date.fromisoformat(text).toordinal()
+    except (TypeError, ValueError):
+        return None
+    return day if datetime.date.fromordinal(day).isoformat() == text else None
+
+
+class LicenseSnapshot:
+    """Column-oriented license rows, addressed by license id."""
+
+    __slots__ = (
+        "ids", "clients", "products", "keys", "expiry_days", "users", "hwids", "generated_days",
+        "_raw_dates", "_pos", "_order_cache",
+    )
+
+    def __init__(self):
+        self.ids = array("q")
+        self.clients = []
+        self.products = []
+        self.keys = []
+        self.expiry_days = array("l")
+        self.users = array("l")
+        self.hwids = []
+        self.generated_days = array("l")
+        # (id, column) -> original text for dates that are not plain ISO dates
+        self._raw_dates = {}
+        self._pos = {}
+        self._order_cache = {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Bulk-build a snapshot column by column (much faster than repeated upsert)."""
+        snap = cls()
+        rows = list(rows)
+        if not rows:
+            return snap
+        ids, clients, products, keys, expiries, users, hwids, generated = zip(*rows)
+        snap.ids = array("q", ids)
+        snap.clients = [sys.intern(c or "") for c in clients]
+        snap.products = [sys.intern(p or "") for p in products]
+        snap.keys = [k or "" for k in keys]
+        snap.users = array("l", [int(u or 0) for u in users])
+        snap.hwids = [h or "" for h in hwids]
+        snap.expiry_days = snap._bulk_days(ids, "expiry_date", expiries)
+        snap.generated_days = snap._bulk_days(ids, "date_generated", generated)
+        snap._pos = dict(zip(ids, range(len(ids))))
+        return snap
+
+    def _bulk_days(self, ids, column, texts):
+        # Dates repeat a lot, so parse each distinct value once
+        parsed = {text: _to_day(text) for text in set(texts)}
+        if None in parsed.values():
+            for license_id, text in zip(ids, texts):
+                if parsed[text] is None:
+                    self._raw_dates[(license_id, column)] = text
+        return array("l", [parsed[text] or 0 for text in texts])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, license_id):
+        return license_id in self._pos
+
+    # ---------------------------
+    #  Incremental updates
+    # ---------------------------
+    def _day(self, license_id, column, text):
+        day = _to_day(text)
+        if day is None:
+            self._raw_dates[(license_id, column)] = text
+            return 0
+        self._raw_dates.pop((license_id, column), None)
+        return day
+
+    def upsert(self, row):
+        """Insert or replace one row given in COLUMNS order."""
+        license_id, client, product, key, expiry, users, hwid, generated = row
+        values = (
+            sys.intern(client or ""),
+            sys.intern(product or ""),
+            key or "",
+            self._day(license_id, "expiry_date", expiry),
+            int(users or 0),
+            hwid or "",
+            self._day(license_id, "date_generated", generated),
+        )
+        pos = self._pos.get(license_id)
+        if pos is None:
+            pos = self._pos[license_id] = len(self.ids)
+            self.ids.append(license_id)
+            for col, value in zip(self._columns()[1:], values):
+                col.append(value)
+            self._reslot(pos, new=True)
+        else:
+            for col, value in zip(self._columns()[1:], values):
+                col[pos] = value
+            self._reslot(pos, new=False)
+
+    def remove(self, license_id):
+        """Drop a row by swapping the last row into its slot (O(1))."""
+        pos = self._pos.pop(license_id, None)
+        if pos is None:
+            return
+        last = len(self.ids) - 1
+        for col in self._columns():
+            if pos != last:
+                col[pos] = col[last]
+            col.pop()
+        if pos != last:
+            self._pos[self.ids[pos]] = pos
+        self._raw_dates.pop((license_id, "expiry_date"), None)
+        self._raw_dates.pop((license_id, "date_generated"), None)
+        self._order_cache.clear()
+
+    def apply(self, upserted, deleted):
+        """Apply a ChangeFeed.poll() result."""
+        if len(upserted) + len(deleted) > _RESLOT_LIMIT:
+            self._order_cache.clear()
+        for license_id in deleted:
+            self.remove(license_id)
+        for row in upserted:
+            self.upsert(row)
+
+    # ---------------------------
+    #  Row access
+    # ---------------------------
+    def _columns(self):
+        return (self.ids, self.clients, self.products, self.keys, self.expiry_days,
+                self.users, self.hwids, self.generated_days)
+
+    def _date_text(self, license_id, column, day):
+        if day == 0:
+            return self._raw_dates.get((license_id, column))
+        return datetime.date.fromordinal(day).isoformat()
+
+    def row(self, license_id):
+        """The row as a tuple in COLUMNS order, or None."""
+        pos = self._pos.get(license_id)
+        if pos is None:
+            return None
+        return (
+            license_id, self.clients[pos], self.products[pos], self.keys[pos],
+            self._date_text(license_id, "expiry_date", self.expiry_days[pos]),
+            self.users[pos], self.hwids[pos],
+            self._date_text(license_id, "date_generated", self.generated_days[pos]),
+        )
+
+    def as_dict(self, license_id):
+        row = self.row(license_id)
+        return dict(zip(COLUMNS, row)) if row is not None else None
+
+    # ---------------------------
+    #  Sort / filter
+    # ---------------------------
+    def column(self, name):
+        return self._columns()[COLUMNS.index(name)]
+
+    def _order(self, name):
+        """Row positions sorted ascending by (column `name`, position); cached."""
+        order = self._order_cache.get(name)
+        if order is not None:
+            return order
+        values = self.column(name)
+        if name in _INTERNED_COLUMNS:
+            # Few distinct values: sort those once, then sort rows by integer rank
+            rank = {v: i for i, v in enumerate(sorted(set(values)))}
+            keys = list(map(rank.__getitem__, values))
+        elif isinstance(values, array):
+            # list indexing is much cheaper than array indexing as a sort key
+            keys = values.tolist()
+        else:
+            keys = values
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._order_cache[name] = order
+        return order
+
+    def _reslot(self, pos, new):
+        """Move row `pos` to its place in every cached order after its values changed."""
+        for name, order in self._order_cache.items():
+            values = self.column(name)
+            if not new:
+                order.remove(pos)
+            key = (values[pos], pos)
+            lo, hi = 0, len(order)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                other = order[mid]
+                if (values[other], other) < key:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            order.insert(lo, pos)
+
+    def sorted_ids(self, name, descending=False, ids=None):
+        """
+        License ids ordered by column `name`. Pass `ids` to order only that
+        subset (e.g. the rows currently shown); leave it out when every row is.
+        """
+        result = list(map(self.ids.__getitem__, self._order(name)))
+        if ids is not None:
+            wanted = set(ids)
+            result = [i for i in result if i in wanted]
+        if descending:
+            result.reverse()
+        return result
+
+    def filter_prefix(self, name, prefix, ids=None):
+        """Ids whose text column `name` starts with `prefix` (case-insensitive)."""
+        values = self.column(name)
+        if name in _DATE_COLUMNS:
+            values = [self._date_text(i, name, d) or "" for i, d in zip(self.ids, values)]
+        elif not isinstance(values, list):
+            values = [str(v) for v in values]
+        prefix = prefix.lower()
+        # Each distinct value is tested once; interned columns have few of them
+        matching = {v for v in set(values) if v.lower().startswith(prefix)}
+        result = [i for i, v in zip(self.ids, values) if v in matching]
+        if ids is not None:
+            wanted = set(ids)
+            result = [i for i in result if i in wanted]
+        return result
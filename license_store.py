@@ -1,94 +1,633 @@
 # license_store.py
 import sqlite3
 import datetime
+import heapq
 import os
+import re
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from license_codec import pack_token, unpack_token
 
 DB_FILE = "licenses.db"
 
-def init_db():
+# Cold tier lives next to each database file: licenses.db -> licenses-archive.db
+ARCHIVE_SUFFIX = "-archive.db"
+# Licenses this many days past expiry (well beyond the verify grace period) are archived
+ARCHIVE_AFTER_DAYS = 90
+
+COLUMNS = ("id", "client_name", "product", "license_key", "expiry_date", "max_users", "hwid", "date_generated")
+
+_SELECT = """
+    SELECT id, client_name, product, license_key, expiry_date, max_users, hwid, date_generated
+    FROM licenses
+"""
+
+_INSERT = """
+    INSERT INTO licenses (client_name, product, license_key, expiry_date, max_users, hwid, date_generated)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Both tiers with the same columns; the archived key is decompressed on the fly
+_SELECT_ALL_TIERS = """
+    SELECT id, client_name, product, license_key, expiry_date, max_users, hwid, date_generated FROM (
+        SELECT id, client_name, product, license_key, expiry_date, max_users, hwid, date_generated
+        FROM licenses
+        UNION ALL
+        SELECT id, client_name, product, unpack_token(license_key_z), expiry_date, max_users, hwid, date_generated
+        FROM archive.licenses_archive
+    )
+"""
+
+_SEARCH_WHERE = (
+    "WHERE client_name LIKE ? ESCAPE '\\' OR product LIKE ? ESCAPE '\\' "
+    "OR hwid LIKE ? ESCAPE '\\' OR license_key LIKE ? ESCAPE '\\'"
+)
+# SQLite's LIKE only folds ASCII letters
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _search_params(term):
+    """LIKE parameters for _SEARCH_WHERE: a plain substring match, "%" and "_" taken literally."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"%{escaped}%"
+    return (pattern, pattern, pattern, pattern)
+
+
+def row_matches_search(row, term):
+    """Python equivalent of search() for one row in COLUMNS order (for incremental updates)."""
+    term = term.translate(_ASCII_LOWER)
+    _, client, product, key, _, _, hwid, _ = row
+    return any(v is not None and term in str(v).translate(_ASCII_LOWER) for v in (client, product, hwid, key))
+
+
+# Change log entries kept behind the newest one; feeds that fall further behind do a full reload.
+CHANGE_LOG_KEEP = 10000
+# Writers prune the change log (via trigger) each time seq reaches a multiple of this.
+CHANGE_LOG_PRUNE_EVERY = 1000
+# A poll spanning more changes than this asks for a full reload instead of row-by-row updates.
+CHANGE_FEED_MAX_BATCH = 2000
+
+# SQLite's default limit on host parameters per statement is 999.
+_ID_CHUNK = 500
+
+
+def archive_path(db_file):
+    root = db_file[:-3] if db_file.endswith(".db") else db_file
+    return root + ARCHIVE_SUFFIX
+
+
+def _with_date(records, today=None):
+    """Normalise save records to 7-tuples, filling date_generated with today when missing."""
+    today = today or datetime.date.today().isoformat()
+    for rec in records:
+        yield tuple(rec) if len(rec) == 7 else tuple(rec) + (today,)
+
+
+# =====================================================
+# STORAGE BACKENDS
+# =====================================================
+
+class StorageBackend:
     """
-    Create the licenses table if missing and ensure the columns exist.
-    This uses explicit column names so SELECT ... returns fields in a consistent order.
+    Interface implemented by every license storage backend.
+    Rows are always returned as tuples in COLUMNS order; include_archived=True
+    makes reads cover the cold archive tier as well as the live table.
     """
-    con = sqlite3.connect(DB_FILE)
-    cur = con.cursor()
-
-    # Create table if missing (with correct column order)
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS licenses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            client_name TEXT,
-            product TEXT,
-            license_key TEXT,
-            expiry_date TEXT,
-            max_users INTEGER,
-            hwid TEXT,
-            date_generated TEXT
+
+    def init_db(self):
+        raise NotImplementedError
+
+    def save_license(self, client, product, license_key, expiry, users, hwid):
+        self.save_many([(client, product, license_key, expiry, users, hwid)])
+
+    def save_many(self, records):
+        """
+        Insert many rows at once. Each record is
+        (client, product, license_key, expiry, users, hwid[, date_generated]).
+        """
+        raise NotImplementedError
+
+    def fetch_all(self, order_desc=True, include_archived=False):
+        raise NotImplementedError
+
+    def search(self, term, include_archived=False):
+        raise NotImplementedError
+
+    def archive_expired(self, cutoff=None, include_superseded=True, batch_size=5000):
+        """Move old rows to the cold tier; returns how many were moved."""
+        raise NotImplementedError
+
+    def iter_search(self, term, batch_size=200, cancelled=lambda: False):
+        """
+        Yield search results in batches, stopping early once cancelled() is true.
+        Backends that can abort a running query override this.
+        """
+        if cancelled():
+            return
+        rows = self.search(term)
+        for i in range(0, len(rows), batch_size):
+            if cancelled():
+                return
+            yield rows[i:i + batch_size]
+
+    def fetch_by_ids(self, ids):
+        raise NotImplementedError
+
+    def change_feed(self):
+        """Return a ChangeFeed for this backend (raises NotImplementedError if unsupported)."""
+        raise NotImplementedError
+
+    def db_files(self):
+        """Paths of the SQLite files holding this backend's data (for backups)."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend(StorageBackend):
+    """Single-file SQLite storage (the original licenses.db layout)."""
+
+    def __init__(self, db_file=DB_FILE):
+        self.db_file = db_file
+        self.archive_file = archive_path(db_file)
+
+    def _connect(self, attach_archive=False):
+        con = sqlite3.connect(self.db_file, timeout=30)
+        if attach_archive:
+            con.execute("ATTACH DATABASE ? AS archive", (self.archive_file,))
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS archive.licenses_archive (
+                    id INTEGER PRIMARY KEY,
+                    client_name TEXT,
+                    product TEXT,
+                    license_key_z BLOB,
+                    expiry_date TEXT,
+                    max_users INTEGER,
+                    hwid TEXT,
+                    date_generated TEXT,
+                    archived_at TEXT
+                )
+            """)
+            con.create_function("pack_token", 1, pack_token, deterministic=True)
+            con.create_function("unpack_token", 1, unpack_token, deterministic=True)
+        return con
+
+    def init_db(self):
+        """
+        Create the licenses table if missing and ensure the columns exist.
+        This uses explicit column names so SELECT ... returns fields in a consistent order.
+        """
+        con = self._connect()
+        cur = con.cursor()
+
+        # WAL lets readers (GUI, change feed, online backups) run alongside writers
+        cur.execute("PRAGMA journal_mode=WAL")
+
+        # Create table if missing (with correct column order)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS licenses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                client_name TEXT,
+                product TEXT,
+                license_key TEXT,
+                expiry_date TEXT,
+                max_users INTEGER,
+                hwid TEXT,
+                date_generated TEXT
+            )
+        """)
+        con.commit()
+
+        # Defensive migration: if older table missing column(s), add them.
+        cur.execute("PRAGMA table_info(licenses)")
+        cols = [r[1] for r in cur.fetchall()]
+
+        # Add any missing columns (safe - ALTER only if column missing)
+        expected = {
+            "client_name": "TEXT",
+            "product": "TEXT",
+            "license_key": "TEXT",
+            "expiry_date": "TEXT",
+            "max_users": "INTEGER",
+            "hwid": "TEXT",
+            "date_generated": "TEXT",
+        }
+        for col, col_type in expected.items():
+            if col not in cols:
+                cur.execute(f"ALTER TABLE licenses ADD COLUMN {col} {col_type}")
+        con.commit()
+
+        # Change log fed by triggers; ChangeFeed reads it with a monotonic seq cursor.
+        cur.executescript("""
+            CREATE TABLE IF NOT EXISTS license_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                license_id INTEGER NOT NULL,
+                op TEXT NOT NULL
+            );
+            CREATE TRIGGER IF NOT EXISTS licenses_change_insert AFTER INSERT ON licenses BEGIN
+                INSERT INTO license_changes (license_id, op) VALUES (new.id, 'I');
+            END;
+            CREATE TRIGGER IF NOT EXISTS licenses_change_update AFTER UPDATE ON licenses BEGIN
+                INSERT INTO license_changes (license_id, op) VALUES (new.id, 'U');
+            END;
+            CREATE TRIGGER IF NOT EXISTS licenses_change_delete AFTER DELETE ON licenses BEGIN
+                INSERT INTO license_changes (license_id, op) VALUES (old.id, 'D');
+            END;
+        """)
+        # Long-running writers (GUI, async store, archiving) keep the log bounded themselves
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS license_changes_prune AFTER INSERT ON license_changes
+            WHEN new.seq % {CHANGE_LOG_PRUNE_EVERY} = 0 BEGIN
+                DELETE FROM license_changes WHERE seq <= new.seq - {CHANGE_LOG_KEEP};
+            END
+        """)
+        cur.execute(
+            "DELETE FROM license_changes WHERE seq <= (SELECT MAX(seq) FROM license_changes) - ?",
+            (CHANGE_LOG_KEEP,),
         )
-    """)
-    con.commit()
-
-    # Defensive migration: if older table missing column(s), add them.
-    cur.execute("PRAGMA table_info(licenses)")
-    cols = [r[1] for r in cur.fetchall()]
-
-    # Add any missing columns (safe - ALTER only if column missing)
-    expected = {
-        "client_name": "TEXT",
-        "product": "TEXT",
-        "license_key": "TEXT",
-        "expiry_date": "TEXT",
-        "max_users": "INTEGER",
-        "hwid": "TEXT",
-        "date_generated": "TEXT",
-    }
-    for col, col_type in expected.items():
-        if col not in cols:
-            cur.execute(f"ALTER TABLE licenses ADD COLUMN {col} {col_type}")
-    con.commit()
-    con.close()
+        # Indexes used by archive_expired() to find expired / superseded rows
+        cur.execute("CREATE INDEX IF NOT EXISTS licenses_expiry ON licenses (expiry_date)")
+        cur.execute("CREATE INDEX IF NOT EXISTS licenses_holder ON licenses (client_name, product, hwid)")
+        con.commit()
+        con.close()
 
-def save_license(client, product, license_key, expiry, users, hwid):
+    def save_license(self, client, product, license_key, expiry, users, hwid):
+        """
+        Insert a license row using explicit column list and set date_generated.
+        """
+        con = self._connect()
+        cur = con.cursor()
+        today = datetime.date.today().isoformat()
+        cur.execute(_INSERT, (client, product, license_key, expiry, users, hwid, today))
+        con.commit()
+        con.close()
+
+    def save_many(self, records):
+        """Insert all records in a single transaction."""
+        con = self._connect()
+        with con:
+            con.executemany(_INSERT, _with_date(records))
+        con.close()
+
+    def _select(self, where="", params=(), order_by="id DESC", include_archived=False):
+        include_archived = include_archived and os.path.exists(self.archive_file)
+        con = self._connect(attach_archive=include_archived)
+        cur = con.cursor()
+        select = _SELECT_ALL_TIERS if include_archived else _SELECT
+        cur.execute(f"{select} {where} ORDER BY {order_by}", params)
+        rows = cur.fetchall()
+        con.close()
+        return rows
+
+    def fetch_all(self, order_desc=True, include_archived=False):
+        """Return rows in the exact column order we expect."""
+        order = "DESC" if order_desc else "ASC"
+        return self._select(order_by=f"id {order}", include_archived=include_archived)
+
+    def search(self, term, include_archived=False):
+        return self._select(_SEARCH_WHERE, _search_params(term), include_archived=include_archived)
+
+    def holders(self):
+        """Distinct (client_name, product, hwid) triples in the live table."""
+        con = self._connect()
+        try:
+            return con.execute("SELECT DISTINCT client_name, product, hwid FROM licenses").fetchall()
+        finally:
+            con.close()
+
+    def archive_expired(self, cutoff=None, include_superseded=True, batch_size=5000, renewed_elsewhere=()):
+        """
+        Move rows that expired before `cutoff` (default: ARCHIVE_AFTER_DAYS ago)
+        and, optionally, rows superseded by a later renewal for the same
+        client/product/hwid into the compressed archive table. Works in
+        batches of `batch_size`, one transaction each, walking ids upwards.
+        `renewed_elsewhere` lists holder triples with a newer row in another
+        database (see ShardedSQLiteBackend); all their rows here count as superseded.
+        """
+        if cutoff is None:
+            cutoff = (datetime.date.today() - datetime.timedelta(days=ARCHIVE_AFTER_DAYS)).isoformat()
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        con = self._connect(attach_archive=True)
+        moved, last_id = 0, 0
+        try:
+            con.execute("CREATE TEMP TABLE renewed_elsewhere (client_name, product, hwid)")
+            if include_superseded and renewed_elsewhere:
+                with con:
+                    con.executemany("INSERT INTO renewed_elsewhere VALUES (?, ?, ?)", renewed_elsewhere)
+                con.execute("CREATE INDEX temp.renewed_holder ON renewed_elsewhere (client_name, product, hwid)")
+            while True:
+                with con:
+                    ids = [r[0] for r in con.execute("""
+                        SELECT l.id FROM licenses l
+                        WHERE l.id > ? AND (
+                            l.expiry_date < ?
+                            OR (? AND (EXISTS (
+                                SELECT 1 FROM licenses n
+                                WHERE n.client_name = l.client_name AND n.product = l.product
+                                  AND n.hwid = l.hwid AND n.id > l.id
+                            ) OR EXISTS (
+                                SELECT 1 FROM renewed_elsewhere r
+                                WHERE r.client_name = l.client_name AND r.product = l.product
+                                  AND r.hwid = l.hwid
+                            )))
+                        )
+                        ORDER BY l.id LIMIT ?
+                    """, (last_id, cutoff, int(include_superseded), batch_size))]
+                    if not ids:
+                        break
+                    for i in range(0, len(ids), _ID_CHUNK):
+                        chunk = ids[i:i + _ID_CHUNK]
+                        marks = ",".join("?" * len(chunk))
+                        # OR REPLACE: WAL commits each attached file separately, so a crash can
+                        # leave a row in both tiers; re-running then simply finishes the move.
+                        con.execute(f"""
+                            INSERT OR REPLACE INTO archive.licenses_archive
+                                (id, client_name, product, license_key_z, expiry_date, max_users, hwid,
+                                 date_generated, archived_at)
+                            SELECT id, client_name, product, pack_token(license_key), expiry_date, max_users,
+                                   hwid, date_generated, ?
+                            FROM licenses WHERE id IN ({marks})
+                        """, [now] + chunk)
+                        con.execute(f"DELETE FROM licenses WHERE id IN ({marks})", chunk)
+                moved += len(ids)
+                last_id = ids[-1]
+                if len(ids) < batch_size:
+                    break
+        finally:
+            con.close()
+        return moved
+
+    def iter_search(self, term, batch_size=200, cancelled=lambda: False):
+        """Stream search results; the progress handler aborts the query as soon as cancelled() is true."""
+        con = self._connect()
+        con.set_progress_handler(lambda: 1 if cancelled() else 0, 1000)
+        try:
+            cur = con.execute(f"{_SELECT} {_SEARCH_WHERE} ORDER BY id DESC", _search_params(term))
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows or cancelled():
+                    break
+                yield rows
+        except sqlite3.OperationalError:
+            # "interrupted" from the progress handler is the normal cancel path
+            if not cancelled():
+                raise
+        finally:
+            con.close()
+
+    def fetch_by_ids(self, ids):
+        con = self._connect()
+        rows = _fetch_by_ids(con, ids)
+        con.close()
+        return rows
+
+    def change_feed(self):
+        return ChangeFeed(self.db_file)
+
+    def db_files(self):
+        files = [self.db_file]
+        if os.path.exists(self.archive_file):
+            files.append(self.archive_file)
+        return files
+
+
+def _fetch_by_ids(con, ids):
+    """Rows for the given ids (newest first), queried in chunks to stay under the parameter limit."""
+    ids = list(ids)
+    rows = []
+    for i in range(0, len(ids), _ID_CHUNK):
+        chunk = ids[i:i + _ID_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        rows.extend(con.execute(f"{_SELECT} WHERE id IN ({marks})", chunk))
+    rows.sort(key=lambda r: r[0], reverse=True)
+    return rows
+
+
+class ChangeFeed:
     """
-    Insert a license row using explicit column list and set date_generated.
+    Incremental view of changes to the licenses table of one SQLite file.
+
+    poll() is cheap when nothing happened: PRAGMA data_version on a long-lived
+    connection only moves when another connection commits. When it has moved,
+    the trigger-maintained license_changes log is read past the last seen seq.
     """
-    con = sqlite3.connect(DB_FILE)
-    cur = con.cursor()
-    today = datetime.date.today().isoformat()
-    cur.execute("""
-        INSERT INTO licenses (client_name, product, license_key, expiry_date, max_users, hwid, date_generated)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (client, product, license_key, expiry, users, hwid, today))
-    con.commit()
-    con.close()
-
-def fetch_all(order_desc=True):
-    """Return rows in the exact column order we expect."""
-    con = sqlite3.connect(DB_FILE)
-    cur = con.cursor()
-    order = "DESC" if order_desc else "ASC"
-    cur.execute(f"""
-        SELECT id, client_name, product, license_key, expiry_date, max_users, hwid, date_generated
-        FROM licenses
-        ORDER BY id {order}
-    """)
-    rows = cur.fetchall()
-    con.close()
-    return rows
 
-def search(term):
-    con = sqlite3.connect(DB_FILE)
-    cur = con.cursor()
-    pattern = f"%{term}%"
-    cur.execute("""
-        SELECT id, client_name, product, license_key, expiry_date, max_users, hwid, date_generated
-        FROM licenses
-        WHERE client_name LIKE ? OR product LIKE ? OR hwid LIKE ? OR license_key LIKE ?
-        ORDER BY id DESC
-    """, (pattern, pattern, pattern, pattern))
-    rows = cur.fetchall()
-    con.close()
-    return rows
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self._con = sqlite3.connect(db_file, timeout=30, check_same_thread=False)
+        self._data_version = None
+        self.cursor = 0
+        self.reset()
+
+    def _max_seq(self):
+        return self._con.execute("SELECT COALESCE(MAX(seq), 0) FROM license_changes").fetchone()[0]
+
+    def reset(self):
+        """Skip to the current end of the log (call right before a full reload)."""
+        self._data_version = self._con.execute("PRAGMA data_version").fetchone()[0]
+        self.cursor = self._max_seq()
+
+    def changed(self):
+        return self._con.execute("PRAGMA data_version").fetchone()[0] != self._data_version
+
+    def poll(self):
+        """
+        Return (upserted_rows, deleted_ids) since the last poll, newest rows first.
+        Returns None when a full reload is needed instead: the log was pruned
+        past our cursor, rolled back behind it (restored from a backup), or
+        more than CHANGE_FEED_MAX_BATCH changes are waiting.
+        """
+        if not self.changed():
+            return [], []
+        self._data_version = self._con.execute("PRAGMA data_version").fetchone()[0]
+
+        first, last = self._con.execute("SELECT MIN(seq), MAX(seq) FROM license_changes").fetchone()
+        if (last or 0) < self.cursor or (
+                first is not None and (first > self.cursor + 1 or last - self.cursor > CHANGE_FEED_MAX_BATCH)):
+            self.reset()
+            return None
+
+        # Last operation per id wins
+        last_op = {}
+        for seq, license_id, op in self._con.execute(
+            "SELECT seq, license_id, op FROM license_changes WHERE seq > ? ORDER BY seq", (self.cursor,)
+        ):
+            last_op[license_id] = op
+            self.cursor = seq
+
+        deleted = [i for i, op in last_op.items() if op == "D"]
+        upserted = _fetch_by_ids(self._con, [i for i, op in last_op.items() if op != "D"])
+        return upserted, deleted
+
+    def close(self):
+        self._con.close()
+
+
+class ShardedSQLiteBackend(StorageBackend):
+    """
+    SQLite storage split over several files in one directory, partitioned by
+    product ("product") or by year of issue ("year").
+
+    Each shard is an independent SQLiteBackend, so writes that land on different
+    shards never contend for the same file lock and are issued in parallel by
+    save_many. Reads fan out to every shard and the sorted per-shard results are
+    merged newest first by (date_generated, id).
+
+    Note: row ids are local to their shard, so the same id may appear twice.
+    """
+
+    PARTITIONS = ("product", "year")
+    SHARD_PREFIX = "licenses_"
+
+    def __init__(self, directory="license_shards", partition="product", max_workers=None):
+        if partition not in self.PARTITIONS:
+            raise ValueError(f"partition must be one of {self.PARTITIONS}, got {partition!r}")
+        self.directory = directory
+        self.partition = partition
+        self._shards = {}
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="license-shard")
+
+    # ---------------------------
+    #  Shard routing
+    # ---------------------------
+    def shard_key(self, product, date_generated):
+        if self.partition == "year":
+            return date_generated[:4]
+        return re.sub(r"[^A-Z0-9_-]", "_", (product or "").upper()) or "_"
+
+    def _shard(self, key):
+        """Return (backend, write lock) for a shard key, creating the shard on first use."""
+        with self._registry_lock:
+            shard = self._shards.get(key)
+            if shard is None:
+                path = os.path.join(self.directory, f"{self.SHARD_PREFIX}{key}.db")
+                shard = SQLiteBackend(path)
+                shard.init_db()
+                self._shards[key] = shard
+                self._locks[key] = threading.Lock()
+            return shard, self._locks[key]
+
+    def _all_shards(self):
+        """Every shard on disk, including ones written by other processes."""
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if (name.startswith(self.SHARD_PREFIX) and name.endswith(".db")
+                        and not name.endswith(ARCHIVE_SUFFIX)):
+                    self._shard(name[len(self.SHARD_PREFIX):-3])
+        with self._registry_lock:
+            return list(self._shards.values())
+
+    # ---------------------------
+    #  StorageBackend API
+    # ---------------------------
+    def init_db(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for shard in self._all_shards():
+            shard.init_db()
+
+    def save_many(self, records):
+        groups = {}
+        for rec in _with_date(records):
+            groups.setdefault(self.shard_key(rec[1], rec[6]), []).append(rec)
+
+        def write(item):
+            shard, lock = self._shard(item[0])
+            with lock:
+                shard.save_many(item[1])
+
+        # list() re-raises the first failure from any shard
+        list(self._pool.map(write, groups.items()))
+
+    def _fan_out(self, where="", params=(), order_desc=True, include_archived=False):
+        order = "DESC" if order_desc else "ASC"
+        order_by = f"date_generated {order}, id {order}"
+        results = self._pool.map(lambda s: s._select(where, params, order_by, include_archived), self._all_shards())
+        return list(heapq.merge(*results, key=lambda r: (r[7] or "", r[0]), reverse=order_desc))
+
+    def fetch_all(self, order_desc=True, include_archived=False):
+        return self._fan_out(order_desc=order_desc, include_archived=include_archived)
+
+    def search(self, term, include_archived=False):
+        return self._fan_out(_SEARCH_WHERE, _search_params(term), include_archived=include_archived)
+
+    def archive_expired(self, cutoff=None, include_superseded=True, batch_size=5000):
+        """
+        Archive every shard in parallel. Under the year partition a renewal
+        usually lands in a later shard than the row it supersedes, so each
+        shard is also told which holders appear in any newer year.
+        """
+        self._all_shards()
+        with self._registry_lock:
+            shards = sorted(self._shards.items(), reverse=True)
+        renewed = [()] * len(shards)
+        if include_superseded and self.partition == "year":
+            # Scan holders before moving anything, newest year first
+            seen = set()
+            for i, (_, shard) in enumerate(shards):
+                renewed[i] = list(seen)
+                seen.update(shard.holders())
+        return sum(self._pool.map(
+            lambda item: item[0][1].archive_expired(cutoff, include_superseded, batch_size, item[1]),
+            zip(shards, renewed),
+        ))
+
+    def db_files(self):
+        return [path for shard in self._all_shards() for path in shard.db_files()]
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+# =====================================================
+# MODULE-LEVEL API (delegates to the active backend)
+# =====================================================
+
+_backend = SQLiteBackend(DB_FILE)
+
+
+def get_backend():
+    return _backend
+
+
+def set_backend(backend):
+    """Swap the backend used by the module-level functions; returns the previous one."""
+    global _backend
+    previous, _backend = _backend, backend
+    return previous
+
+
+def init_db():
+    _backend.init_db()
+
+def save_license(client, product, license_key, expiry, users, hwid):
+    _backend.save_license(client, product, license_key, expiry, users, hwid)
+
+def save_many(records):
+    _backend.save_many(records)
+
+def fetch_all(order_desc=True, include_archived=False):
+    return _backend.fetch_all(order_desc, include_archived)
+
+def search(term, include_archived=False):
+    return _backend.search(term, include_archived)
+
+def archive_expired(cutoff=None, include_superseded=True, batch_size=5000):
+    return _backend.archive_expired(cutoff, include_superseded, batch_size)
+
+def fetch_by_ids(ids):
+    return _backend.fetch_by_ids(ids)
+
+def open_change_feed():
+    """ChangeFeed for the active backend, or None if it does not support one."""
+    try:
+        return _backend.change_feed()
+    except NotImplementedError:
+        return None
 
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,155 @@
+# license_store_async.py
+"""
+Asyncio counterparts of the license_store functions.
+
+All database work runs on one dedicated executor thread, so the event loop
+never blocks on disk I/O. Saves awaited concurrently are coalesced: while the
+DB thread is busy, new records queue up and are committed together in a
+single save_many() transaction. If that transaction fails, each caller's
+records are retried on their own, so only the caller with bad input sees
+the error.
+
+Usage:
+    import license_store_async as store
+    await store.init_db()
+    await store.save_license("Acme", "ACME", key, "2026-01-01", 5, hwid)
+    rows = await store.fetch_all()
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import license_store
+
+
+class AsyncLicenseStore:
+    """Event-loop friendly wrapper around a license_store backend."""
+
+    def __init__(self, backend=None, max_batch=500):
+        # None means "whatever license_store is currently configured with"
+        self._backend = backend
+        self.max_batch = max_batch
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="license-db")
+        self._lock = threading.Lock()
+        self._pending = []
+        self._flush_scheduled = False
+
+    @property
+    def backend(self):
+        return self._backend or license_store.get_backend()
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    # ---------------------------
+    #  Write batching
+    # ---------------------------
+    def _flush(self):
+        """Runs on the DB thread: commit everything queued so far in one transaction."""
+        with self._lock:
+            # Whole caller requests only, up to about max_batch records
+            taken, size = 0, 0
+            while taken < len(self._pending) and (taken == 0 or size < self.max_batch):
+                size += len(self._pending[taken][0])
+                taken += 1
+            batch = self._pending[:taken]
+            del self._pending[:taken]
+            if self._pending:
+                self._executor.submit(self._flush)
+            else:
+                self._flush_scheduled = False
+
+        backend = self.backend
+        try:
+            backend.save_many([rec for records, _, _ in batch for rec in records])
+            errors = [None] * len(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                errors = [e]
+            else:
+                # The combined transaction rolled back; isolate the caller(s) at fault
+                errors = []
+                for records, _, _ in batch:
+                    try:
+                        backend.save_many(records)
+                        errors.append(None)
+                    except Exception as own:
+                        errors.append(own)
+
+        for (_, fut, loop), error in zip(batch, errors):
+            loop.call_soon_threadsafe(_settle, fut, error)
+
+    async def save_many(self, records):
+        records = [tuple(rec) for rec in records]
+        if not records:
+            return
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        with self._lock:
+            self._pending.append((records, fut, loop))
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                self._executor.submit(self._flush)
+        await fut
+
+    async def save_license(self, client, product, license_key, expiry, users, hwid):
+        await self.save_many([(client, product, license_key, expiry, users, hwid)])
+
+    # ---------------------------
+    #  Reads / schema
+    # ---------------------------
+    async def init_db(self):
+        await self._run(self.backend.init_db)
+
+    async def fetch_all(self, order_desc=True, include_archived=False):
+        return await self._run(self.backend.fetch_all, order_desc, include_archived)
+
+    async def search(self, term, include_archived=False):
+        return await self._run(self.backend.search, term, include_archived)
+
+    def close(self):
+        """Wait for queued writes to land, then stop the DB thread."""
+        self._executor.shutdown(wait=True)
+
+
+def _settle(fut, error):
+    if fut.done():
+        return
+    if error is None:
+        fut.set_result(None)
+    else:
+        fut.set_exception(error)
+
+
+# =====================================================
+# MODULE-LEVEL API (shared default store)
+# =====================================================
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AsyncLicenseStore()
+        return _store
+
+
+async def init_db():
+    await get_store().init_db()
+
+async def save_license(client, product, license_key, expiry, users, hwid):
+    await get_store().save_license(client, product, license_key, expiry, users, hwid)
+
+async def save_many(records):
+    await get_store().save_many(records)
+
+async def fetch_all(order_desc=True, include_archived=False):
+    return await get_store().fetch_all(order_desc, include_archived)
+
+async def search(term, include_archived=False):
+    return await get_store().search(term, include_archived)
@@ -4,7 +4,8 @@ from tkinter import ttk, filedialog, messagebox
 import sv_ttk
 import os
 from keygen_lock import HardwareLicense, get_hardware_id
-import base64, json
+from license_codec import TokenDecodeError, decode_token, parse_payload
+import json
 
 """
 Improved tester:
@@ -139,14 +140,8 @@ class LicenseTester(tk.Tk):
     def decode_token_payload(self, token):
         """Try to decode base64 payload and return JSON payload (without checking signature)."""
         try:
-            raw = base64.urlsafe_b64decode(token.encode())
-            parts = raw.split(b".")
-            if len(parts) != 2:
-                return None
-            payload_bytes = parts[0]
-            payload = json.loads(payload_bytes.decode())
-            return payload
-        except Exception:
+            return parse_payload(decode_token(token))
+        except (TokenDecodeError, ValueError):
             return None
 
     def verify_license(self, key, save_on_success=False, source_path=None):
@@ -162,13 +157,13 @@ class LicenseTester(tk.Tk):
         if res.get("grace"):
             msg = (f"License expired on {info.get('exp')}.\n"
                    f"Grace period active: {res.get('days_left')} day(s) remaining.\n\n"
-                   f"Product: {info.get('product')}\nHWID: {info.get('hwid')}\nUsers: {info.get('users')}")
+                   f"Product: {info.get('product')}\nHWID: {info.get('hwid', 'cluster license')}\nUsers: {info.get('users')}")
             self.update_status("⚠️ EXPIRED (Grace Active)", msg, "orange")
         else:
             msg = (f"License valid for: {info.get('product')}\n"
                    f"Expires: {info.get('exp')}  ({res.get('days_left')} day(s) left)\n"
                    f"Max users: {info.get('users')}\n"
-                   f"HWID: {info.get('hwid')}")
+                   f"HWID: {info.get('hwid', 'cluster license')}")
             self.update_status("✅ LICENSE VALID", msg, "green")
 
         # If verified OK and asked to save, write to license.key so it persists across restarts
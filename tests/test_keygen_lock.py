@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from keygen_lock import (
+    HardwareLicense, Keyring, SigningKey, get_hardware_id, hwset_contains, hwset_size, load_keyring_from_env,
+    pack_hwset,
+)
+
+EXPIRY = (datetime.now().date() + timedelta(days=30)).isoformat()
+
+
+def _issue(gen):
+    return gen.generate_license("ROT", EXPIRY, 3, get_hardware_id())
+
+
+def test_rotation_keeps_old_tokens_valid():
+    ring = Keyring()
+    ring.add("k1", b"old-secret")
+    gen = HardwareLicense(keyring=ring)
+    old = _issue(gen)
+    assert old.startswith("k1.")
+
+    ring.add("k2", b"new-secret", "blake2b", activate=True)
+    new = _issue(gen)
+    assert new.startswith("k2.")
+    assert gen.verify_license(old)["valid"]
+    assert gen.verify_license(new)["valid"]
+
+    ring.remove("k1")
+    assert not gen.verify_license(old)["valid"]
+    assert gen.verify_license(new)["valid"]
+
+
+def test_activate_switches_signing_key():
+    ring = Keyring()
+    ring.add("a", b"s1")
+    ring.add("b", b"s2")
+    assert ring.active.kid == "a"
+    ring.activate("b")
+    assert _issue(HardwareLicense(keyring=ring)).startswith("b.")
+    with pytest.raises(KeyError):
+        ring.activate("missing")
+
+
+def test_unknown_kid_is_rejected():
+    signer = Keyring()
+    signer.add("k9", b"secret")
+    token = _issue(HardwareLicense(keyring=signer))
+    verifier = Keyring()
+    verifier.add("k1", b"secret")
+    result = HardwareLicense(keyring=verifier).verify_license(token)
+    assert not result["valid"]
+    assert "Unknown key ID" in result["reason"]
+
+
+def test_wrong_secret_is_rejected():
+    a, b = Keyring(), Keyring()
+    a.add("k1", b"one", "blake2b")
+    b.add("k1", b"two", "blake2b")
+    result = HardwareLicense(keyring=b).verify_license(_issue(HardwareLicense(keyring=a)))
+    assert result == {"valid": False, "reason": "Invalid signature"}
+
+
+def test_blake2b_signing_is_keyed_and_truncated():
+    key = SigningKey(b"secret", "blake2b")
+    sig = key.sign(b"payload")
+    assert len(sig) == 8
+    assert sig == key.sign(b"payload")
+    assert sig != SigningKey(b"other", "blake2b").sign(b"payload")
+    assert sig != SigningKey(b"secret").sign(b"payload")
+    with pytest.raises(ValueError):
+        SigningKey(b"secret", "md5")
+
+
+def test_legacy_tokens_without_kid_still_verify():
+    token = _issue(HardwareLicense(keyring=None))
+    assert "." not in token
+    ring = Keyring()
+    ring.add("k1", b"unrelated")
+    assert HardwareLicense(keyring=ring).verify_license(token)["valid"]
+
+
+def test_cluster_license_covers_every_listed_machine():
+    others = [f"{i:016X}" for i in range(40)]
+    hwset = pack_hwset(others + [others[0].lower()])
+    assert hwset_size(hwset) == 40
+    assert all(hwset_contains(hwset, h) for h in others)
+    assert not hwset_contains(hwset, "FFFFFFFFFFFFFFFF")
+
+    gen = HardwareLicense(keyring=None)
+    assert gen.verify_license(gen.generate_license("C", EXPIRY, 3, others + [get_hardware_id()]))["valid"]
+    result = gen.verify_license(gen.generate_license("C", EXPIRY, 3, others))
+    assert not result["valid"] and "hardware set" in result["reason"]
+
+def test_keyring_from_env(monkeypatch):
+    monkeypatch.setenv("PYKG_KEYRING", "k1:hmac-sha256:Old,k2:blake2b:New:with:colons")
+    ring = load_keyring_from_env()
+    assert len(ring) == 2 and ring.active_kid == "k2"
+    monkeypatch.delenv("PYKG_KEYRING")
+    assert load_keyring_from_env() is None
+
+
+@pytest.mark.parametrize("spec", ["k1", "k1:hmac-sha256", "k1:hmac-sha256:", "k1:md5:x", "bad kid:blake2b:x", " , "])
+def test_malformed_env_keyring_names_the_variable(monkeypatch, spec):
+    monkeypatch.setenv("PYKG_KEYRING", spec)
+    with pytest.raises(ValueError, match="PYKG_KEYRING"):
+        load_keyring_from_env()
@@ -0,0 +1,74 @@
+import json
+import sqlite3
+
+import pytest
+
+from license_audit import AuditLog
+
+
+def _log(monkeypatch, db_file, **kwargs):
+    log = AuditLog(str(db_file), flush_interval=3600, actor="tester", **kwargs)
+    # No background writer: tests drive flush() themselves
+    monkeypatch.setattr(log, "_start", lambda: None)
+    return log
+
+
+def _events(db_file):
+    con = sqlite3.connect(str(db_file))
+    try:
+        return con.execute("SELECT event, details FROM audit_events ORDER BY id").fetchall()
+    finally:
+        con.close()
+
+
+def test_record_and_flush(monkeypatch, tmp_path):
+    log = _log(monkeypatch, tmp_path / "audit.db")
+    log.record("generate", product="P", users=3)
+    log.record("verify", valid=True)
+    assert log.flush() == 2
+    assert log.flush() == 0
+    events = _events(tmp_path / "audit.db")
+    assert [e for e, _ in events] == ["generate", "verify"]
+    assert json.loads(events[0][1]) == {"product": "P", "users": 3}
+    assert [row[3] for row in log.fetch_events()] == ["verify", "generate"]
+
+
+def test_burst_drops_oldest_and_writes_a_dropped_event(monkeypatch, tmp_path):
+    log = _log(monkeypatch, tmp_path / "audit.db", capacity=10)
+    for i in range(25):
+        log.record("verify", n=i)
+    assert log.dropped == 15
+    log.flush()
+    events = _events(tmp_path / "audit.db")
+    assert [json.loads(d)["n"] for e, d in events if e == "verify"] == list(range(15, 25))
+    assert [json.loads(d) for e, d in events if e == "dropped"] == [{"events": 15}]
+
+    log.record("verify", n=99)
+    log.flush()
+    assert len([e for e, _ in _events(tmp_path / "audit.db") if e == "dropped"]) == 1
+
+
+def test_failed_flush_keeps_newest_events_and_counts_the_rest(monkeypatch, tmp_path):
+    log = _log(monkeypatch, tmp_path, capacity=10)  # a directory: every flush fails
+    for i in range(8):
+        log.record("verify", n=i)
+    with pytest.raises(sqlite3.Error):
+        log.flush()
+    for i in range(8, 14):
+        log.record("verify", n=i)
+    with pytest.raises(sqlite3.Error):
+        log.flush()
+    assert log.dropped == 4
+
+    log.db_file = str(tmp_path / "audit.db")
+    log.flush()
+    events = _events(tmp_path / "audit.db")
+    assert [json.loads(d)["n"] for e, d in events if e == "verify"] == list(range(4, 14))
+    assert [json.loads(d) for e, d in events if e == "dropped"] == [{"events": 4}]
+
+
+def test_close_flushes_pending_events(tmp_path):
+    log = AuditLog(str(tmp_path / "audit.db"), flush_interval=3600)
+    log.record("export", file="a.key")
+    log.close()
+    assert [e for e, _ in _events(tmp_path / "audit.db")] == ["export"]
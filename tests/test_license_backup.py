@@ -0,0 +1,49 @@
+from license_backup import BackupManager
+from license_store import ChangeFeed, SQLiteBackend
+
+
+def _setup(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "licenses.db"))
+    backend.init_db()
+    manager = BackupManager([backend.db_file], backup_dir=str(tmp_path / "backups"), keep=2)
+    return backend, manager
+
+
+def _rows(n, start=0):
+    return [("Acme", "P", f"key-{i}", "2030-01-01", 1, f"HW{i}") for i in range(start, start + n)]
+
+
+def test_snapshot_restore_round_trip(tmp_path):
+    backend, manager = _setup(tmp_path)
+    backend.save_many(_rows(5))
+    snapshot = manager.snapshot()
+    assert snapshot and manager.snapshot() is None  # unchanged: skipped
+    backend.save_many(_rows(3, start=5))
+    manager.restore(snapshot)
+    assert len(backend.fetch_all()) == 5
+
+
+def test_rotation_keeps_newest(tmp_path):
+    backend, manager = _setup(tmp_path)
+    for i in range(4):
+        backend.save_many(_rows(1, start=i))
+        manager.snapshot()
+    assert len(manager.list_snapshots()) == 2
+
+
+def test_open_change_feed_reloads_after_restore(tmp_path):
+    backend, manager = _setup(tmp_path)
+    backend.save_many(_rows(5))
+    snapshot = manager.snapshot()
+    backend.save_many(_rows(20, start=5))
+
+    feed = ChangeFeed(backend.db_file)
+    manager.restore(snapshot)
+    # Enough new writes to carry seq past the feed's cursor again
+    backend.save_many(_rows(30, start=100))
+    assert feed.poll() is None
+
+    backend.save_many(_rows(1, start=200))
+    upserted, deleted = feed.poll()
+    assert [r[3] for r in upserted] == ["key-200"] and deleted == []
+    feed.close()
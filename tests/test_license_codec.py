@@ -0,0 +1,85 @@
+import base64
+import os
+
+import pytest
+
+from license_codec import (
+    MAX_TOKEN_LENGTH, SIGNATURE_SIZE, SignatureLengthError, TokenAlphabetError, TokenDecodeError,
+    TokenFormatError, TokenLengthError, TokenVersionError, decode_token, encode_token, pack_token,
+    parse_payload, unpack_token,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAYLOAD = b'{"exp":"2030-01-01","hwid":"0123456789ABCDEF","product":"P","users":5}'
+SIGNATURE = b"\x01\x02.\x04\x05\x06\x07\x08"  # contains the separator byte on purpose
+
+
+def test_unpadded_round_trip():
+    token = encode_token(PAYLOAD, SIGNATURE)
+    assert "=" not in token
+    decoded = decode_token(token)
+    assert decoded.kid is None
+    assert bytes(decoded.payload) == PAYLOAD
+    assert bytes(decoded.signature) == SIGNATURE
+    assert parse_payload(decoded)["users"] == 5
+
+
+def test_padded_tokens_are_accepted():
+    padded = base64.urlsafe_b64encode(PAYLOAD + b"." + SIGNATURE).decode("ascii")
+    assert padded.endswith("=")
+    decoded = decode_token(padded)
+    assert bytes(decoded.payload) == PAYLOAD
+    assert bytes(decoded.signature) == SIGNATURE
+
+
+def test_repo_license_key_decodes():
+    with open(os.path.join(ROOT, "license.key"), encoding="utf-8") as f:
+        token = f.read().strip()
+    assert token.endswith("=")
+    assert "product" in parse_payload(decode_token(token))
+
+
+def test_key_id_prefix():
+    token = encode_token(PAYLOAD, SIGNATURE, kid="k2")
+    assert token.startswith("k2.")
+    decoded = decode_token(token)
+    assert decoded.kid == "k2"
+    assert bytes(decoded.payload) == PAYLOAD
+    assert decode_token(token + "=").kid == "k2"
+
+
+@pytest.mark.parametrize("token, error", [
+    ("", TokenLengthError),
+    ("x" * (MAX_TOKEN_LENGTH + 1), TokenLengthError),
+    ("eyJ", TokenLengthError),
+    ("bad kid!." + encode_token(PAYLOAD, SIGNATURE), TokenVersionError),
+    ("é" * 40, TokenAlphabetError),
+    (encode_token(PAYLOAD, SIGNATURE)[:-4] + "!!!!", TokenAlphabetError),
+    (encode_token(PAYLOAD, SIGNATURE)[:-4] + "ab+/", TokenAlphabetError),  # standard, not url-safe
+    (encode_token(PAYLOAD, SIGNATURE) + "===", TokenAlphabetError),
+    (base64.urlsafe_b64encode(b"[" + PAYLOAD[1:] + b"." + SIGNATURE).decode(), TokenFormatError),
+    (encode_token(PAYLOAD, SIGNATURE[:-1]), SignatureLengthError),
+])
+def test_junk_is_rejected(token, error):
+    with pytest.raises(error):
+        decode_token(token)
+
+
+def test_decode_errors_are_value_errors():
+    assert issubclass(TokenDecodeError, ValueError)
+
+
+@pytest.mark.parametrize("token", [
+    encode_token(PAYLOAD, SIGNATURE),
+    encode_token(PAYLOAD, SIGNATURE, kid="k1"),
+    base64.urlsafe_b64encode(PAYLOAD + b"." + SIGNATURE).decode("ascii"),  # padded: stored verbatim
+    "not a token",
+    None,
+])
+def test_pack_round_trip(token):
+    assert unpack_token(pack_token(token)) == token
+
+
+def test_signature_size():
+    assert len(decode_token(encode_token(PAYLOAD, SIGNATURE)).signature) == SIGNATURE_SIZE
@@ -0,0 +1,98 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+from keygen_lock import HardwareLicense, get_hardware_id
+from license_seats import SeatStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _token(max_users):
+    expiry = (datetime.now().date() + timedelta(days=30)).isoformat()
+    return HardwareLicense().generate_license("SEATS", expiry, max_users, get_hardware_id())
+
+
+def _acquire_in_other_process(db_file, token, seat_id, max_users):
+    code = (
+        "import sys; from license_seats import SeatStore; s = SeatStore(sys.argv[1]); "
+        "sys.exit(0 if s.acquire(s.license_id(sys.argv[2]), sys.argv[3], int(sys.argv[4])) else 1)"
+    )
+    return subprocess.run(
+        [sys.executable, "-c", code, db_file, token, seat_id, str(max_users)], cwd=ROOT
+    ).returncode == 0
+
+
+def test_acquire_enforces_max_users(tmp_path):
+    seats = SeatStore(str(tmp_path / "seats.db"))
+    lid = seats.license_id(_token(2))
+    assert seats.acquire(lid, "a", 2)
+    assert seats.acquire(lid, "b", 2)
+    assert not seats.acquire(lid, "c", 2)
+    assert seats.acquire(lid, "a", 2)  # renewing a held seat is always allowed
+    seats.release(lid, "a")
+    assert seats.acquire(lid, "c", 2)
+    assert seats.in_use(lid) == 2
+    seats.close()
+
+
+def test_expired_leases_free_their_seat(tmp_path):
+    seats = SeatStore(str(tmp_path / "seats.db"), lease_seconds=-1)
+    lid = seats.license_id(_token(1))
+    assert seats.acquire(lid, "a", 1)
+    assert seats.in_use(lid) == 0
+    assert seats.acquire(lid, "b", 1)
+    seats.close()
+
+
+def test_verify_sees_seat_taken_by_another_process(tmp_path):
+    db_file = str(tmp_path / "seats.db")
+    token = _token(1)
+    seats = SeatStore(db_file, refresh_interval=0)
+    gen = HardwareLicense()
+    assert gen.verify_license(token, seats=seats)["valid"]
+
+    assert _acquire_in_other_process(db_file, token, "OTHER-MACHINE", 1)
+    result = gen.verify_license(token, seats=seats)
+    assert not result["valid"]
+    assert "seats in use" in result["reason"]
+
+    seats.release(seats.license_id(token), "OTHER-MACHINE")
+    result = gen.verify_license(token, seats=seats)
+    assert result["valid"] and result["seats_in_use"] == 0
+    seats.close()
+
+
+def test_verify_allows_the_seat_holder(tmp_path):
+    db_file = str(tmp_path / "seats.db")
+    token = _token(1)
+    assert _acquire_in_other_process(db_file, token, get_hardware_id(), 1)
+    seats = SeatStore(db_file)
+    result = HardwareLicense().verify_license(token, seats=seats)
+    assert result["valid"] and result["seats_in_use"] == 1
+    seats.close()
+
+
+def test_refresh_is_rate_limited(tmp_path):
+    db_file = str(tmp_path / "seats.db")
+    token = _token(1)
+    seats = SeatStore(db_file, refresh_interval=3600)
+    lid = seats.license_id(token)
+    assert _acquire_in_other_process(db_file, token, "OTHER-MACHINE", 1)
+    assert not seats.refresh()
+    assert seats.in_use(lid) == 0
+    assert seats.refresh(force=True)
+    assert seats.in_use(lid) == 1
+    seats.close()
+
+
+def test_refresh_does_not_wait_for_writers(tmp_path):
+    db_file = str(tmp_path / "seats.db")
+    token = _token(1)
+    seats = SeatStore(db_file, refresh_interval=0)
+    assert _acquire_in_other_process(db_file, token, "OTHER-MACHINE", 1)
+    with seats._write_lock:  # a local writer stuck on the file lock
+        assert seats.refresh()
+    assert seats.in_use(seats.license_id(token)) == 1
+    seats.close()
@@ -0,0 +1,36 @@
+import random
+
+from license_snapshot import LicenseSnapshot
+
+
+def _row(i, rng):
+    return (i, rng.choice(["Acme", "Globex", "Hooli"]), rng.choice(["P", "Q"]), f"key-{rng.random()}",
+            f"20{rng.randrange(20, 40)}-01-{rng.randrange(1, 28):02d}", rng.randrange(1, 50), "HW", "2024-01-01")
+
+
+def _fresh_order(snap, column, descending=False):
+    return LicenseSnapshot.from_rows(snap.row(i) for i in snap.ids).sorted_ids(column, descending)
+
+
+def test_sorted_ids_match_python_sort():
+    rng = random.Random(1)
+    rows = [_row(i, rng) for i in range(1, 500)]
+    snap = LicenseSnapshot.from_rows(rows)
+    for column, index in (("client_name", 1), ("expiry_date", 4), ("max_users", 5), ("license_key", 3)):
+        expected = [r[0] for r in sorted(rows, key=lambda r: r[index])]
+        assert snap.sorted_ids(column) == expected
+    assert snap.sorted_ids("max_users", ids=[3, 1, 2]) == [r[0] for r in sorted(rows[:3], key=lambda r: r[5])]
+
+
+def test_upserts_keep_cached_orders_correct():
+    rng = random.Random(2)
+    snap = LicenseSnapshot.from_rows(_row(i, rng) for i in range(1, 300))
+    columns = ("client_name", "product", "expiry_date", "max_users", "license_key", "id")
+    for column in columns:
+        snap.sorted_ids(column)
+    for i in list(range(1, 300, 7)) + list(range(300, 320)):
+        snap.upsert(_row(i, rng))
+    snap.remove(5)
+    snap.upsert(_row(5, rng))
+    for column in columns:
+        assert snap.sorted_ids(column, descending=True) == _fresh_order(snap, column, descending=True)
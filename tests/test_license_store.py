@@ -0,0 +1,107 @@
+import sqlite3
+
+from license_store import (
+    CHANGE_FEED_MAX_BATCH, CHANGE_LOG_KEEP, CHANGE_LOG_PRUNE_EVERY, ChangeFeed, SQLiteBackend,
+    ShardedSQLiteBackend, row_matches_search,
+)
+
+
+def _backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "licenses.db"))
+    backend.init_db()
+    return backend
+
+
+def test_archive_expired_moves_rows_and_keeps_keys(tmp_path):
+    backend = _backend(tmp_path)
+    backend.save_license("Acme", "P", "literal-key", "2000-01-01", 1, "HW1")
+    backend.save_license("Acme", "P", "fresh-key", "2999-01-01", 1, "HW2")
+    assert backend.archive_expired(cutoff="2020-01-01", include_superseded=False) == 1
+    assert [r[3] for r in backend.fetch_all()] == ["fresh-key"]
+    assert sorted(r[3] for r in backend.fetch_all(include_archived=True)) == ["fresh-key", "literal-key"]
+
+
+def test_archive_expired_handles_null_license_key(tmp_path):
+    backend = _backend(tmp_path)
+    con = sqlite3.connect(backend.db_file)
+    with con:
+        con.execute("INSERT INTO licenses (client_name, product, license_key, expiry_date, max_users, hwid) "
+                    "VALUES ('Old', 'P', NULL, '2000-01-01', 1, 'HW')")
+    con.close()
+    assert backend.archive_expired(cutoff="2020-01-01") == 1
+    assert backend.fetch_all() == []
+    (row,) = backend.fetch_all(include_archived=True)
+    assert row[1] == "Old" and row[3] is None
+
+
+def test_sharded_year_partition_archives_renewals_across_shards(tmp_path):
+    backend = ShardedSQLiteBackend(str(tmp_path / "shards"), partition="year")
+    backend.init_db()
+    backend.save_many([
+        ("Acme", "P", "2023-key", "2999-01-01", 1, "HW1", "2023-05-01"),
+        ("Acme", "P", "2024-key", "2999-01-01", 1, "HW1", "2024-05-01"),
+        ("Acme", "P", "2025-key", "2999-01-01", 1, "HW1", "2025-05-01"),
+        ("Acme", "P", "other-key", "2999-01-01", 1, "HW2", "2023-06-01"),
+    ])
+    assert backend.archive_expired(cutoff="2020-01-01", include_superseded=False) == 0
+    assert backend.archive_expired(cutoff="2020-01-01") == 2
+    assert sorted(r[3] for r in backend.fetch_all()) == ["2025-key", "other-key"]
+
+def _rows(n, start=0):
+    return [("Acme", "P", f"key-{i}", "2030-01-01", 1, f"HW{i}") for i in range(start, start + n)]
+
+
+def test_change_feed_reports_upserts_and_deletes(tmp_path):
+    backend = _backend(tmp_path)
+    feed = ChangeFeed(backend.db_file)
+    backend.save_many(_rows(3))
+    upserted, deleted = feed.poll()
+    assert [r[3] for r in upserted] == ["key-2", "key-1", "key-0"]
+    assert deleted == []
+
+    con = sqlite3.connect(backend.db_file)
+    with con:
+        con.execute("DELETE FROM licenses WHERE license_key = 'key-1'")
+    con.close()
+    upserted, deleted = feed.poll()
+    assert upserted == [] and len(deleted) == 1
+    assert feed.poll() == ([], [])
+    feed.close()
+
+
+def test_change_log_is_pruned_by_writers(tmp_path):
+    backend = _backend(tmp_path)
+    total = CHANGE_LOG_KEEP + 3 * CHANGE_LOG_PRUNE_EVERY
+    backend.save_many(_rows(total))
+    con = sqlite3.connect(backend.db_file)
+    count = con.execute("SELECT COUNT(*) FROM license_changes").fetchone()[0]
+    con.close()
+    assert count <= CHANGE_LOG_KEEP + CHANGE_LOG_PRUNE_EVERY
+
+
+def test_large_backlog_asks_for_full_reload(tmp_path):
+    backend = _backend(tmp_path)
+    feed = ChangeFeed(backend.db_file)
+    backend.save_many(_rows(CHANGE_FEED_MAX_BATCH + 1))
+    assert feed.poll() is None
+    backend.save_many(_rows(2, start=CHANGE_FEED_MAX_BATCH + 1))
+    upserted, _ = feed.poll()
+    assert len(upserted) == 2
+    feed.close()
+
+
+def test_search_treats_like_wildcards_literally(tmp_path):
+    backend = _backend(tmp_path)
+    backend.save_many([
+        ("Acme", "DEMO_PRODUCT", "k1", "2030-01-01", 1, "HW1"),
+        ("Acme", "DEMOXPRODUCT", "k2", "2030-01-01", 1, "HW2"),
+        ("100% Ltd", "P", "k3", "2030-01-01", 1, "HW3"),
+        ("Back\\slash", "P", "k4", "2030-01-01", 1, "HW4"),
+        ("Ünicode", "P", "k5", "2030-01-01", 1, "HW5"),
+    ])
+    rows = backend.fetch_all()
+    for term in ("o_p", "O_P", "0%", "%", "_", "k\\s", "acme", "ünicode", "Ünicode", "hw"):
+        found = {r[0] for r in backend.search(term)}
+        streamed = {r[0] for batch in backend.iter_search(term) for r in batch}
+        assert found == streamed == {r[0] for r in rows if row_matches_search(r, term)}, term
+    assert [r[2] for r in backend.search("o_p")] == ["DEMO_PRODUCT"]
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+
+from license_store import SQLiteBackend
+from license_store_async import AsyncLicenseStore
+
+
+class RecordingBackend(SQLiteBackend):
+    """Counts save_many() calls; the first one is slow so later saves pile up behind it."""
+
+    def __init__(self, db_file):
+        super().__init__(db_file)
+        self.batches = []
+
+    def save_many(self, records):
+        records = list(records)
+        self.batches.append(len(records))
+        if len(self.batches) == 1:
+            time.sleep(0.1)
+        super().save_many(records)
+
+
+def _record(i):
+    return ("Acme", "P", f"key-{i}", "2030-01-01", 1, f"HW{i}")
+
+
+@pytest.fixture
+def store(tmp_path):
+    backend = RecordingBackend(str(tmp_path / "licenses.db"))
+    backend.init_db()
+    store = AsyncLicenseStore(backend)
+    yield store
+    store.close()
+
+
+def test_concurrent_saves_are_coalesced(store):
+    async def main():
+        await asyncio.gather(*(store.save_license(*_record(i)) for i in range(50)))
+        return await store.fetch_all()
+
+    rows = asyncio.run(main())
+    assert len(rows) == 50
+    assert len(store.backend.batches) <= 3
+    assert max(store.backend.batches) > 1
+
+
+def test_bad_input_only_fails_its_own_caller(store):
+    async def main():
+        good = [store.save_license(*_record(i)) for i in range(5)]
+        bad = store.save_many([("bad",)])
+        return await asyncio.gather(*good, bad, return_exceptions=True), await store.fetch_all()
+
+    results, rows = asyncio.run(main())
+    assert results[:5] == [None] * 5
+    assert isinstance(results[5], Exception)
+    assert sorted(r[3] for r in rows) == [f"key-{i}" for i in range(5)]
+
+
+def test_max_batch_splits_between_callers(tmp_path):
+    backend = RecordingBackend(str(tmp_path / "licenses.db"))
+    backend.init_db()
+    store = AsyncLicenseStore(backend, max_batch=10)
+
+    async def main():
+        await asyncio.gather(*(store.save_many([_record(i * 4 + j) for j in range(4)]) for i in range(10)))
+
+    asyncio.run(main())
+    store.close()
+    assert sum(backend.batches) == 40
+    assert all(size % 4 == 0 and size <= 12 for size in backend.batches)
+
+
+def test_reads_can_include_archived_rows(store):
+    store.backend.save_many([("Acme", "P", "old-key", "2019-01-01", 1, "HW0"), _record(1)])
+    store.backend.archive_expired(cutoff="2020-01-01", include_superseded=False)
+
+    async def main():
+        return (await store.fetch_all(), await store.fetch_all(include_archived=True),
+                await store.search("old", include_archived=True))
+
+    live, both, found = asyncio.run(main())
+    assert [r[3] for r in live] == ["key-1"]
+    assert sorted(r[3] for r in both) == ["key-1", "old-key"]
+    assert [r[3] for r in found] == ["old-key"]
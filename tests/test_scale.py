@@ -0,0 +1,68 @@
+"""
+Scale checks on a 100k-row synthetic fleet (built once, cached under fixtures/).
+Time limits are loose on purpose: they catch accidental O(n^2) paths, not jitter.
+"""
+
+import os
+import time
+
+import pytest
+
+from license_fixtures import fixture_db, run_benchmarks
+from license_snapshot import LicenseSnapshot
+from license_store import SQLiteBackend
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROWS = 100_000
+
+
+@pytest.fixture(scope="module")
+def fleet():
+    return SQLiteBackend(fixture_db(ROWS, directory=os.path.join(ROOT, "fixtures")))
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def test_fixture_is_deterministic_and_spec_keyed(tmp_path):
+    a = fixture_db(200, seed=7, directory=str(tmp_path), workers=1)
+    b = fixture_db(200, seed=7, directory=str(tmp_path), workers=1, years=1)
+    assert a != b
+    assert fixture_db(200, seed=7, directory=str(tmp_path)) == a
+    rows_a = [r[1:] for r in SQLiteBackend(a).fetch_all()]
+    rebuilt = fixture_db(200, seed=7, directory=str(tmp_path / "again"), workers=1)
+    assert [r[1:] for r in SQLiteBackend(rebuilt).fetch_all()] == rows_a
+
+
+def test_fetch_all(fleet):
+    rows, elapsed = _timed(fleet.fetch_all)
+    assert len(rows) == ROWS
+    assert rows[0][0] > rows[-1][0]
+    assert elapsed < 5
+
+
+def test_search(fleet):
+    rows, elapsed = _timed(fleet.search, "ACME")
+    assert rows
+    assert all("acme" in " ".join(str(v) for v in (r[1], r[2], r[3], r[6])).lower() for r in rows)
+    assert elapsed < 5
+
+
+def test_snapshot_sort(fleet):
+    rows = fleet.fetch_all()
+    snap, load = _timed(LicenseSnapshot.from_rows, rows)
+    assert len(snap) == ROWS and load < 5
+    for column, index in (("client_name", 1), ("expiry_date", 4)):
+        ids, elapsed = _timed(snap.sorted_ids, column, descending=True)
+        assert elapsed < 5
+        values = [snap.as_dict(i)[column] for i in ids]
+        assert values == sorted((r[index] for r in rows), reverse=True)
+
+
+def test_run_benchmarks(fleet):
+    count, timings = run_benchmarks(fleet.db_file)
+    assert count == ROWS
+    assert set(timings) >= {"fetch_all", "snapshot load"}